@@ -4,18 +4,32 @@ import sqlite3
 conn = sqlite3.connect('tools_database.db')
 cursor = conn.cursor()
 
-# Создаем таблицу если нет
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS material_sizes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        width REAL NOT NULL,
-        thickness REAL NOT NULL,
-        name TEXT NOT NULL,
-        description TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
+# Настройки для пакетной вставки: один fsync на всю транзакцию
+cursor.executescript('''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
 ''')
 
+# Схему создаем только если ее еще нет (одна выборка из sqlite_master)
+cursor.execute(
+    "SELECT name FROM sqlite_master WHERE name IN ('material_sizes', 'ix_ms_w_t_n')"
+)
+existing = {row[0] for row in cursor.fetchall()}
+
+if 'material_sizes' not in existing:
+    cursor.execute('''
+        CREATE TABLE material_sizes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            width REAL NOT NULL,
+            thickness REAL NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
 # Добавляем тестовые данные
 materials = [
     (50, 50, 'Thermowood', 'WT'),
@@ -35,12 +49,28 @@ materials = [
     (200, 25, 'Thermowood', 'WT'),
 ]
 
-cursor.executemany(
-    'INSERT INTO material_sizes (width, thickness, name, description) VALUES (?, ?, ?, ?)',
-    materials
-)
-
-conn.commit()
+# Вставляем все строки одной транзакцией
+with conn:
+    cursor.execute('BEGIN IMMEDIATE')
+    # Уникальный индекс делает повторный запуск скрипта безопасным. Дубликаты,
+    # оставшиеся от прежних запусков, удаляем в той же транзакции (остается
+    # строка с меньшим id), иначе индекс не создать
+    if 'ix_ms_w_t_n' not in existing:
+        cursor.execute('''
+            DELETE FROM material_sizes WHERE id NOT IN (
+                SELECT MIN(id) FROM material_sizes GROUP BY width, thickness, name
+            )
+        ''')
+        if cursor.rowcount > 0:
+            print(f"Удалено {cursor.rowcount} дубликатов заготовок")
+        cursor.execute('''
+            CREATE UNIQUE INDEX ix_ms_w_t_n
+            ON material_sizes(width, thickness, name)
+        ''')
+    cursor.executemany(
+        'INSERT OR IGNORE INTO material_sizes (width, thickness, name, description) VALUES (?, ?, ?, ?)',
+        materials
+    )
 print(f"Добавлено {cursor.rowcount} заготовок")
 
 # Проверяем
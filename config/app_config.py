@@ -3,12 +3,22 @@
 """
 import json
 import os
+from copy import deepcopy
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Маркер отсутствующего значения в кэше get()
+_MISSING = object()
+
 class AppConfig:
     """Конфигурация приложения"""
     
@@ -68,9 +78,17 @@ class AppConfig:
         }
     }
     
+    # Заранее разобранные пути для часто используемых ключей
+    _SECURITY_MODE_KEYS = ("security", "mode")
+    _DATABASE_PATH_KEYS = ("database", "path")
+    _HEAD_MAPPING_KEYS = ("heads", "mapping")
+    _HEAD_NAMES_KEYS = ("heads", "names")
+    
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file
-        self.config = self.DEFAULT_CONFIG.copy()
+        # Глубокая копия: вложенные словари не должны разделяться с DEFAULT_CONFIG
+        self.config = deepcopy(self.DEFAULT_CONFIG)
+        self._get_cache: Dict[str, Any] = {}  # кэш get() по составному ключу
         
         if config_file and os.path.exists(config_file):
             self.load(config_file)
@@ -87,17 +105,30 @@ class AppConfig:
             return False
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                loaded_config = json.load(f)
-                self._deep_update(self.config, loaded_config)
+            if HAS_ORJSON:
+                with open(self.config_file, 'rb') as f:
+                    loaded_config = orjson.loads(f.read())
+            else:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded_config = json.load(f)
+            self._deep_update(self.config, loaded_config)
+            self._invalidate_caches()
             logger.info(f"Configuration loaded from {self.config_file}")
             return True
         except Exception as e:
             logger.error(f"Error loading configuration: {e}")
             return False
     
-    def save(self, config_file: Optional[str] = None) -> bool:
-        """Сохраняет конфигурацию в файл"""
+    def save(self, config_file: Optional[str] = None,
+             snapshot: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Сохраняет конфигурацию в файл
+        
+        Args:
+            snapshot: копия self.config, снятая в потоке, который ее менял;
+                      нужна при сохранении из другого потока
+        """
+        config = self.config if snapshot is None else snapshot
         if config_file:
             self.config_file = config_file
         
@@ -109,8 +140,31 @@ class AppConfig:
             # Создаем директорию если не существует
             os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
+            if HAS_ORJSON:
+                # orjson сам сериализует int-ключи (heads.mapping / heads.names)
+                data = orjson.dumps(
+                    config,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                )
+            else:
+                data = json.dumps(config, ensure_ascii=False, indent=2).encode('utf-8')
+            
+            # Не перезаписываем файл, если содержимое не изменилось
+            try:
+                with open(self.config_file, 'rb') as f:
+                    if f.read() == data:
+                        logger.debug(f"Configuration unchanged, skip writing {self.config_file}")
+                        return True
+            except OSError:
+                pass
+            
+            # Пишем во временный файл и атомарно заменяем им конфигурацию
+            tmp_file = self.config_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
             
             logger.info(f"Configuration saved to {self.config_file}")
             return True
@@ -131,7 +185,23 @@ class AppConfig:
     
     def get(self, key: str, default: Any = None) -> Any:
         """Получает значение по ключу (с поддержкой вложенных ключей)"""
-        keys = key.split('.')
+        value = self._get_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        value = self._get_by_keys(key.split('.'), _MISSING)
+        if value is _MISSING:
+            return default
+        
+        self._get_cache[key] = value
+        return value
+    
+    def set(self, key: str, value: Any) -> bool:
+        """Устанавливает значение по ключу"""
+        return self._set_by_keys(key.split('.'), value)
+    
+    def _get_by_keys(self, keys: Sequence[str], default: Any = None) -> Any:
+        """Получает значение по уже разобранному пути ключей"""
         value = self.config
         
         for k in keys:
@@ -142,9 +212,8 @@ class AppConfig:
         
         return value
     
-    def set(self, key: str, value: Any) -> bool:
-        """Устанавливает значение по ключу"""
-        keys = key.split('.')
+    def _set_by_keys(self, keys: Sequence[str], value: Any) -> bool:
+        """Устанавливает значение по уже разобранному пути ключей"""
         config = self.config
         
         # Проходим по всем ключам кроме последнего
@@ -155,11 +224,16 @@ class AppConfig:
         
         # Устанавливаем значение
         config[keys[-1]] = value
+        self._invalidate_caches()
         return True
     
+    def _invalidate_caches(self) -> None:
+        """Сбрасывает кэши, зависящие от содержимого конфигурации"""
+        self._get_cache.clear()
+    
     def get_database_path(self) -> str:
         """Возвращает путь к базе данных"""
-        db_path = self.get("database.path")
+        db_path = self._get_by_keys(self._DATABASE_PATH_KEYS)
         if db_path and not os.path.isabs(db_path):
             # Если путь относительный, делаем его абсолютным относительно домашней директории
             home_dir = Path.home()
@@ -169,27 +243,31 @@ class AppConfig:
     
     def get_head_mapping(self) -> Dict[int, str]:
         """Возвращает карту соответствия голов"""
-        return self.get("heads.mapping", self.DEFAULT_CONFIG["heads"]["mapping"])
+        return self._get_by_keys(self._HEAD_MAPPING_KEYS, self.DEFAULT_CONFIG["heads"]["mapping"])
     
     def get_head_names(self) -> Dict[int, str]:
         """Возвращает имена голов"""
-        return self.get("heads.names", self.DEFAULT_CONFIG["heads"]["names"])
+        return self._get_by_keys(self._HEAD_NAMES_KEYS, self.DEFAULT_CONFIG["heads"]["names"])
     
     def get_security_mode(self) -> str:
         """Возвращает текущий режим безопасности"""
-        return self.get("security.mode", "read_only")
+        return self._get_by_keys(self._SECURITY_MODE_KEYS, "read_only")
     
     def set_security_mode(self, mode: str) -> bool:
         """Устанавливает режим безопасности"""
-        return self.set("security.mode", mode)
+        return self._set_by_keys(self._SECURITY_MODE_KEYS, mode)
     
     def _deep_update(self, target: Dict, source: Dict) -> Dict:
-        """Рекурсивно обновляет словарь"""
-        for key, value in source.items():
-            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                self._deep_update(target[key], value)
-            else:
-                target[key] = value
+        """Глубоко обновляет словарь (обход через стек, без рекурсии)"""
+        stack = [(target, source)]
+        while stack:
+            current_target, current_source = stack.pop()
+            for key, value in current_source.items():
+                target_value = current_target.get(key)
+                if isinstance(target_value, dict) and isinstance(value, dict):
+                    stack.append((target_value, value))
+                else:
+                    current_target[key] = value
         return target
     
     def to_dict(self) -> Dict[str, Any]:
@@ -207,7 +285,11 @@ def get_config() -> AppConfig:
     return _config_instance
 
 def init_config(config_file: Optional[str] = None) -> AppConfig:
-    """Инициализирует глобальную конфигурацию"""
+    """Инициализирует глобальную конфигурацию (повторный вызов возвращает тот же экземпляр)"""
     global _config_instance
+    if _config_instance is not None and (
+        config_file is None or config_file == _config_instance.config_file
+    ):
+        return _config_instance
     _config_instance = AppConfig(config_file)
     return _config_instance
\ No newline at end of file
@@ -3,6 +3,8 @@ Security modes management for Weinig application
 """
 import json
 import logging
+import threading
+from copy import deepcopy
 from pathlib import Path
 from typing import Optional, Callable, List
 
@@ -10,34 +12,62 @@ logger = logging.getLogger(__name__)
 
 # Импортируем AppConfig
 try:
-    from .app_config import AppConfig
+    from .app_config import AppConfig, get_config
 except ImportError:
-    from config.app_config import AppConfig
+    from config.app_config import AppConfig, get_config
+
+
+# Кэш текущего режима для быстрой проверки is_read_only() из UI
+# (None - менеджер еще не создан)
+_READ_ONLY: Optional[bool] = None
+
+
+def _sync_read_only(read_only: bool):
+    """Callback: обновляет кэшированный режим на уровне модуля"""
+    global _READ_ONLY
+    _READ_ONLY = read_only
 
 
 class SecurityManager:
     _instance = None
-    _initialized = False
+    
+    # Задержка перед записью конфигурации (секунды) - объединяет частые переключения
+    SAVE_DELAY = 0.25
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+        # Инициализация выполняется только при создании единственного экземпляра,
+        # повторные вызовы SecurityManager() сразу возвращают готовый объект
+        instance = cls._instance
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._setup()
+            cls._instance = instance
+        return instance
     
-    def __init__(self):
-        # Гарантируем, что инициализация выполняется только один раз
-        if not self._initialized:
-            self.app_config = AppConfig()
-            
-            # Загружаем текущий режим из конфигурации
-            current_mode = self.app_config.get('security.mode', 'read_only')
-            self._read_only = (current_mode == 'read_only')
-            
-            self._callbacks = []  # Для уведомлений об изменениях
-            self._initialized = True
-            
-            logger.info(f"Security mode initialized as: {'Read Only' if self._read_only else 'Full Access'}")
-            logger.info(f"Loaded from config: security.mode = {current_mode}")
+    def _setup(self):
+        """Однократная инициализация синглтона"""
+        # Используем глобальную конфигурацию, а не создаем новую
+        self.app_config: AppConfig = get_config()
+        
+        # Загружаем текущий режим из конфигурации
+        current_mode = self.app_config.get_security_mode()
+        self._read_only = (current_mode == 'read_only')
+        
+        self._callbacks = []  # Для уведомлений об изменениях
+        
+        # Поддерживаем кэш режима на уровне модуля
+        _sync_read_only(self._read_only)
+        self._callbacks.append(_sync_read_only)
+        
+        # Отложенное сохранение конфигурации: таймер пишет снимок, снятый
+        # в потоке изменения, и не читает живой словарь конфигурации
+        self._snapshot: Optional[dict] = None
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        
+        logger.info(f"Security mode initialized as: {'Read Only' if self._read_only else 'Full Access'}")
+        logger.info(f"Loaded from config: security.mode = {current_mode}")
     
     def add_callback(self, callback: Callable[[bool], None]):
         """Добавить callback для уведомления об изменениях режима"""
@@ -57,20 +87,46 @@ class SecurityManager:
             except Exception as e:
                 logger.error(f"Error in security callback: {e}")
     
+    def _schedule_save(self):
+        """Планирует сохранение конфигурации (серия изменений - одна запись)"""
+        snapshot = deepcopy(self.app_config.config)
+        with self._save_lock:
+            self._snapshot = snapshot
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self) -> bool:
+        """Немедленно сохраняет отложенные изменения конфигурации"""
+        # Записи из таймера и из flush() при выходе не пересекаются, а снимок
+        # берется уже под блокировкой записи - более старый не запишется последним
+        with self._write_lock:
+            with self._save_lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                snapshot, self._snapshot = self._snapshot, None
+            if snapshot is None:
+                return True
+            save_success = self.app_config.save(snapshot=snapshot)
+        if save_success:
+            logger.info(f"Configuration saved successfully")
+        else:
+            logger.error(f"Failed to save configuration!")
+        return save_success
+    
     def toggle_security_mode(self):
         """Переключает режим безопасности"""
         self._read_only = not self._read_only
         
         # Сохраняем в конфигурацию с правильным ключом
         mode = 'read_only' if self._read_only else 'full_access'
-        success = self.app_config.set('security.mode', mode)
+        success = self.app_config.set_security_mode(mode)
         
         if success:
-            save_success = self.app_config.save()
-            if save_success:
-                logger.info(f"Configuration saved successfully")
-            else:
-                logger.error(f"Failed to save configuration!")
+            self._schedule_save()
         
         # Логируем
         mode_text = 'Read Only' if self._read_only else 'Full Access'
@@ -91,18 +147,22 @@ class SecurityManager:
     
     def set_full_access(self):
         """Switch to full access mode"""
+        if not self._read_only and self.app_config.get_security_mode() == 'full_access':
+            return
         self._read_only = False
-        self.app_config.set('security.mode', 'full_access')
-        save_success = self.app_config.save()
-        logger.info(f"Switched to Full Access mode (save: {'success' if save_success else 'failed'})")
+        self.app_config.set_security_mode('full_access')
+        self._schedule_save()
+        logger.info("Switched to Full Access mode")
         self._notify_callbacks()
     
     def set_read_only(self):
         """Switch to read-only mode"""
+        if self._read_only and self.app_config.get_security_mode() == 'read_only':
+            return
         self._read_only = True
-        self.app_config.set('security.mode', 'read_only')
-        save_success = self.app_config.save()
-        logger.info(f"Switched to Read Only mode (save: {'success' if save_success else 'failed'})")
+        self.app_config.set_security_mode('read_only')
+        self._schedule_save()
+        logger.info("Switched to Read Only mode")
         self._notify_callbacks()
     
     def get_current_mode(self) -> str:
@@ -117,7 +177,7 @@ class SecurityManager:
 # Глобальные функции доступа
 def get_security_manager() -> SecurityManager:
     """Получить глобальный экземпляр SecurityManager"""
-    return SecurityManager()
+    return SecurityManager._instance or SecurityManager()
 
 def get_security_mode() -> str:
     """Получить текущий режим безопасности"""
@@ -125,4 +185,6 @@ def get_security_mode() -> str:
 
 def is_read_only() -> bool:
     """Проверить, находится ли приложение в режиме только для чтения"""
-    return get_security_manager().is_read_only()
\ No newline at end of file
+    if _READ_ONLY is None:
+        return get_security_manager().is_read_only()
+    return _READ_ONLY
\ No newline at end of file
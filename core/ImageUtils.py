@@ -3,26 +3,79 @@ Image processing utilities for file-based storage
 """
 
 import logging
+import shutil
 from pathlib import Path
+from types import ModuleType
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-try:
-    from PIL import Image
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
-    logger.warning("Pillow library not installed. Image functionality will be limited.")
+# Pillow импортируется при первом использовании, а не при импорте модуля
+_PIL_IMAGE: Optional[ModuleType] = None
+_PIL_CHECKED = False
+
+
+def _get_pil_image() -> Optional[ModuleType]:
+    """Возвращает модуль PIL.Image (или None, если Pillow не установлен)"""
+    global _PIL_IMAGE, _PIL_CHECKED
+    if not _PIL_CHECKED:
+        _PIL_CHECKED = True
+        try:
+            from PIL import Image
+            _PIL_IMAGE = Image
+        except ImportError:
+            logger.warning("Pillow library not installed. Image functionality will be limited.")
+    return _PIL_IMAGE
+
+
+# PyTurboJPEG (libjpeg-turbo) - необязательный ускоритель кодирования JPEG
+_TURBOJPEG = None
+_TURBOJPEG_CHECKED = False
+
+
+def _get_turbojpeg():
+    """Возвращает экземпляр TurboJPEG (или None, если библиотека недоступна)"""
+    global _TURBOJPEG, _TURBOJPEG_CHECKED
+    if not _TURBOJPEG_CHECKED:
+        _TURBOJPEG_CHECKED = True
+        try:
+            from turbojpeg import TurboJPEG
+            _TURBOJPEG = TurboJPEG()
+        except Exception as e:
+            # Нет пакета или не найдена сама libturbojpeg - работаем через Pillow
+            logger.debug(f"TurboJPEG not available, using Pillow encoder: {e}")
+    return _TURBOJPEG
+
+
+def _save_jpeg(img, target_path: Path, quality: int = 85) -> None:
+    """Сохраняет RGB-изображение в JPEG (через libjpeg-turbo, если доступен)"""
+    turbo = _get_turbojpeg()
+    if turbo is not None and img.mode == "RGB":
+        import numpy
+        from turbojpeg import TJPF_RGB
+        target_path.write_bytes(
+            turbo.encode(numpy.asarray(img), quality=quality, pixel_format=TJPF_RGB)
+        )
+        return
+    img.save(target_path, format="JPEG", quality=quality)
+
 
 # Папка для хранения изображений
 IMG_DIR = Path("IMG")
 THUMBS_DIR = IMG_DIR / "thumbs"
 PDF_ICON_PATH = IMG_DIR / "pdf_icon.png"  # здесь должна быть иконка PDF
 
-# Создаем папки, если не существуют
-IMG_DIR.mkdir(parents=True, exist_ok=True)
-THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+_dirs_ready = False
+
+
+def _ensure_dirs() -> None:
+    """Создает папки для изображений при первом сохранении"""
+    global _dirs_ready
+    if _dirs_ready:
+        return
+    IMG_DIR.mkdir(parents=True, exist_ok=True)
+    THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+    _dirs_ready = True
 
 
 class ImageUtils:
@@ -32,27 +85,33 @@ class ImageUtils:
     def save_image(file_path: Path, target_name: str) -> Optional[Path]:
         """Сохраняет изображение или PDF в IMG/"""
         try:
+            _ensure_dirs()
             file_path = Path(file_path)
             ext = file_path.suffix.lower()
             
             if ext == ".pdf":
                 target_path = IMG_DIR / f"{target_name}.pdf"
-                target_path.write_bytes(file_path.read_bytes())
+                # Копируем потоково, не загружая весь файл в память
+                shutil.copyfile(file_path, target_path)
                 return target_path
             
             elif ext in (".jpg", ".jpeg", ".png", ".gif"):
-                if not HAS_PIL:
+                Image = _get_pil_image()
+                if Image is None:
                     logger.warning("Pillow not installed, copying file as is.")
                     target_path = IMG_DIR / f"{target_name}{ext}"
-                    target_path.write_bytes(file_path.read_bytes())
+                    shutil.copyfile(file_path, target_path)
                     return target_path
                 
                 img = Image.open(file_path)
+                if img.format == "JPEG":
+                    # JPEG декодируем сразу в уменьшенном масштабе (1/2, 1/4, 1/8)
+                    img.draft("RGB", (800, 600))
                 # Сжимаем до ширины 800 и высоты 600
                 img.thumbnail((800, 600), Image.LANCZOS)
                 target_path = IMG_DIR / f"{target_name}.jpg"
                 img = img.convert("RGB")  # всегда сохраняем в RGB JPEG
-                img.save(target_path, format="JPEG", quality=85)
+                _save_jpeg(img, target_path)
                 return target_path
             
             else:
@@ -72,16 +131,20 @@ class ImageUtils:
         if ext == ".pdf":
             return PDF_ICON_PATH  # для PDF используем иконку
         
-        if not HAS_PIL:
+        Image = _get_pil_image()
+        if Image is None:
             logger.warning("Pillow not installed, thumbnail cannot be created.")
             return None
         
         try:
+            _ensure_dirs()
             img = Image.open(file_path)
+            if img.format == "JPEG":
+                img.draft("RGB", size)
             img.thumbnail(size, Image.LANCZOS)
             thumb_path = THUMBS_DIR / f"{target_name}.jpg"
             img = img.convert("RGB")
-            img.save(thumb_path, format="JPEG", quality=85)
+            _save_jpeg(img, thumb_path)
             return thumb_path
         except Exception as e:
             logger.error(f"Error creating thumbnail for {file_path}: {e}")
@@ -98,8 +161,13 @@ class ImageUtils:
         return PDF_ICON_PATH
 
     @staticmethod
-    def validate_image(file_path: Path, max_size_mb: int = 10) -> Tuple[bool, str]:
-        """Проверяет размер и корректность изображения или PDF"""
+    def validate_image(file_path: Path, max_size_mb: int = 10,
+                       deep_verify: bool = False) -> Tuple[bool, str]:
+        """Проверяет размер и корректность изображения или PDF
+        
+        По умолчанию читается только заголовок; deep_verify=True
+        дополнительно проверяет целостность всего файла.
+        """
         file_path = Path(file_path)
         if not file_path.exists():
             return False, "File does not exist"
@@ -111,11 +179,13 @@ class ImageUtils:
         if file_path.suffix.lower() == ".pdf":
             return True, "PDF file"
         
-        if HAS_PIL:
+        Image = _get_pil_image()
+        if Image is not None:
             try:
-                img = Image.open(file_path)
-                img.verify()
-                return True, f"Valid {img.format} image, {img.width}x{img.height}"
+                with Image.open(file_path) as img:
+                    if deep_verify:
+                        img.verify()
+                    return True, f"Valid {img.format} image, {img.width}x{img.height}"
             except Exception as e:
                 return False, f"Invalid image file: {e}"
         
@@ -1,16 +1,226 @@
 import sqlite3
 import os
+import re
 import sys
+import atexit
+import weakref
+import queue
+import functools
 import logging
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union, Tuple
+from typing import Optional, List, Dict, Any, Union, Tuple, Iterator
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Столбцы Tools в порядке Tool.from_db_row; фото набора подключается из Tool_Photos
+TOOL_COLUMNS = (
+    "t.ID, t.Profile_ID, t.Position, t.Tool_Type, t.Set_Number, "
+    "t.Auto_Generated_Code, t.Knives_Count, t.Template_ID, t.Set_Status, t.Notes"
+)
+_TOOL_SELECT = (
+    "SELECT " + TOOL_COLUMNS + ", {photo} AS Photo, p.Set_Code IS NOT NULL AS Has_Photo "
+    "FROM Tools t LEFT JOIN Tool_Photos p ON p.Set_Code = t.Base_Code"
+)
+# Для списков - только признак наличия фото (BLOB не читается)
+_TOOL_LIST_SELECT = _TOOL_SELECT.format(photo="NULL")
+_TOOL_FULL_SELECT = _TOOL_SELECT.format(photo="p.Image_Data")
+
+# Столбцы Profiles без устаревшего BLOB Image (он остается только в старых базах)
+PROFILE_COLUMNS = (
+    "ID, Name, Description, Feed_rate, Material_size, Product_size, pdf_path, Created_Date"
+)
+
+# Строка назначения инструмента: класс общий для всех строк (без словаря
+# на строку, как у dict(row)), доступ к полям по атрибутам и по индексу
+AssignmentRow = namedtuple(
+    'AssignmentRow',
+    'ID Profile_ID Tool_ID Head_Number RPM Pass_Depth Work_Material Remarks Tool_Code'
+)
+
+
+def _assignment_row_factory(cursor: sqlite3.Cursor, row: tuple) -> AssignmentRow:
+    """row_factory курсора для запросов, возвращающих AssignmentRow"""
+    return AssignmentRow._make(row)
+
+def _close_at_exit(ref: "weakref.ref[DatabaseManager]") -> None:
+    """atexit: фиксирует отложенные записи и закрывает пул, если менеджер еще жив"""
+    db = ref()
+    if db is not None:
+        db.close()
+
+# Код инструмента: ровно 6 ASCII-цифр (isdigit()/int() принимают и Unicode-цифры)
+_TOOL_CODE_RE = re.compile(r'[0-9]{6}')
+
+# DELETE ... RETURNING и ALTER TABLE ... DROP COLUMN поддерживаются начиная с SQLite 3.35
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_HAS_DROP_COLUMN = _HAS_RETURNING
+
+
+@functools.lru_cache(maxsize=128)
+def _update_sql(table: str, columns: Tuple[str, ...]) -> str:
+    """
+    Текст UPDATE ... WHERE ID = ? для набора столбцов
+    
+    Один и тот же набор столбцов всегда дает один и тот же текст запроса,
+    поэтому sqlite3 берет уже подготовленное выражение из кэша соединения.
+    """
+    return f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE ID = ?"
+
+
+def _update_statement(table: str, values: Dict[str, Any], row_id: int) -> Tuple[str, List[Any]]:
+    """
+    UPDATE и параметры для словаря {столбец: значение}
+    
+    Столбцы упорядочиваются (sorted), поэтому любая перестановка одних и тех же
+    полей дает один текст запроса и одну запись в кэше выражений. Шаблон с
+    COALESCE(?, столбец) не подходит: через него нельзя записать NULL.
+    """
+    columns = tuple(sorted(values))
+    params = [values[column] for column in columns]
+    params.append(row_id)
+    return _update_sql(table, columns), params
+
+
 class DatabaseManager:
     """Менеджер базы данных SQLite"""
 
+    # Настройки каждого нового соединения (WAL включается один раз в __init__)
+    CONNECTION_PRAGMAS = """
+        PRAGMA foreign_keys = ON;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -20000;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA busy_timeout = 5000;
+    """
+
+    # Размер кэша подготовленных выражений на соединение (по умолчанию 100/128):
+    # ключ кэша - точный текст SQL, поэтому все запросы модуля - неизменные
+    # литералы, а динамические (IN (...), UPDATE) строятся детерминированно
+    STATEMENT_CACHE_SIZE = 256
+
+    # Максимальное число соединений для чтения в пуле
+    READER_POOL_SIZE = 5
+    
+    # Сколько секунд ждать свободное соединение для чтения, если пул исчерпан
+    # (например, незавершенными генераторами stream=True); после этого открывается
+    # временное соединение вне пула
+    READER_WAIT_TIMEOUT = 5.0
+
+    # Размер пакета для массовых вставок и списков IN (...)
+    BULK_BATCH_SIZE = 50
+
+    # Отложенная фиксация записей с flush=False: COMMIT выполняется, когда
+    # накопилось DEFERRED_COMMIT_BATCH записей или прошло DEFERRED_COMMIT_DELAY секунд
+    DEFERRED_COMMIT_BATCH = 100
+    DEFERRED_COMMIT_DELAY = 0.5
+
+    # Размер LRU-кэша строк get_profile / get_tool* (без фото); кэш целиком
+    # сбрасывается при любой записи через соединение для записи
+    ROW_CACHE_SIZE = 256
+
+    # Размер пакета fetchmany при потоковом чтении (execute_query(stream=True))
+    STREAM_BATCH_SIZE = 256
+
+    # Версия схемы хранится в PRAGMA user_version: BASE_SCHEMA_VERSION
+    # получает база после создания таблиц, SCHEMA_VERSION - после всех миграций
+    BASE_SCHEMA_VERSION = 1
+    SCHEMA_VERSION = 3
+
+    # Покрывающий индекс для get_tool_assignments: WHERE Profile_ID + ORDER BY
+    # Head_Number и все выбираемые столбцы читаются из индекса без обращения к таблице
+    _ASSIGNMENTS_COVERING_INDEX = (
+        "CREATE INDEX IF NOT EXISTS idx_assignments_head_cov ON Tool_Assignments"
+        "(Profile_ID, Head_Number, Tool_ID, RPM, Pass_Depth, Work_Material, Remarks)"
+    )
+
+    # Базовая схема: выполняется одним executescript при создании базы
+    _BASE_SCHEMA_SQL = '''
+        -- 1. Сначала создаем Profiles (без Image и с новыми дефолтами)
+        CREATE TABLE IF NOT EXISTS Profiles (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name TEXT NOT NULL UNIQUE,
+            Description TEXT,
+            Feed_rate REAL DEFAULT 30.0,
+            Material_size TEXT DEFAULT '',
+            Product_size TEXT DEFAULT '',
+            pdf_path TEXT,
+            Created_Date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- 2. Обязательно создаем material_sizes (она нужна для вариантов!)
+        CREATE TABLE IF NOT EXISTS material_sizes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            width REAL NOT NULL,
+            thickness REAL NOT NULL,
+            name TEXT,
+            description TEXT
+        );
+
+        -- 3. Таблица вариантов продукта
+        CREATE TABLE IF NOT EXISTS product_size_variants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL,
+            width REAL NOT NULL,
+            thickness REAL NOT NULL,
+            material_id INTEGER,
+            is_default BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (profile_id) REFERENCES Profiles (ID) ON DELETE CASCADE,
+            FOREIGN KEY (material_id) REFERENCES material_sizes (id) ON DELETE SET NULL
+        );
+
+        -- Индекс для быстрого поиска
+        CREATE INDEX IF NOT EXISTS idx_product_variants_profile
+        ON product_size_variants(profile_id);
+
+        -- Таблица инструментов
+        CREATE TABLE IF NOT EXISTS Tools (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Profile_ID INTEGER NOT NULL,
+            Position TEXT,
+            Tool_Type TEXT,
+            Set_Number INTEGER DEFAULT 1,
+            Auto_Generated_Code TEXT UNIQUE,
+            Knives_Count INTEGER DEFAULT 6,
+            Template_ID TEXT,
+            Set_Status TEXT DEFAULT 'ready',
+            Notes TEXT,
+            FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE
+        );
+
+        -- Таблица шаблонов изображений инструментов
+        CREATE TABLE IF NOT EXISTS Tool_Image_Templates (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Profile_ID INTEGER NOT NULL,
+            Position TEXT NOT NULL,
+            Tool_Type TEXT NOT NULL,
+            Image_Data BLOB NOT NULL,
+            Created_Date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE,
+            UNIQUE(Profile_ID, Position, Tool_Type)
+        );
+
+        -- Таблица назначений инструментов на головы
+        CREATE TABLE IF NOT EXISTS Tool_Assignments (
+            ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Profile_ID INTEGER NOT NULL,
+            Tool_ID INTEGER NOT NULL,
+            Head_Number INTEGER NOT NULL CHECK (Head_Number BETWEEN 1 AND 10),
+            RPM INTEGER,
+            Pass_Depth REAL,
+            Work_Material TEXT,
+            Remarks TEXT,
+            FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE,
+            FOREIGN KEY (Tool_ID) REFERENCES Tools (ID) ON DELETE CASCADE,
+            UNIQUE(Profile_ID, Head_Number)
+        );
+    '''
+
     def __init__(self, db_path: str = None):
         if db_path is None:
             if getattr(sys, "frozen", False):
@@ -22,143 +232,322 @@ class DatabaseManager:
 
             db_path = os.path.join(project_dir, "tools_database.db")
 
-        self.db_path = os.path.abspath(db_path)
+        self.db_path = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+
+        if self.db_path != ':memory:':
+            db_dir = os.path.dirname(self.db_path)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Database path: %s (directory exists: %s)",
+                             self.db_path, os.path.isdir(db_dir))
+            # Права на запись не проверяем заранее: реальную ошибку
+            # сообщит sqlite3.connect
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Пул соединений: одно соединение для записи (SQLite все равно
+        # сериализует запись) и несколько соединений для чтения
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
+        # Генераторы stream=True, которые держат соединение для чтения;
+        # close() закрывает недочитанные, чтобы вернуть соединения в пул
+        self._streams: "weakref.WeakSet[Iterator[sqlite3.Row]]" = weakref.WeakSet()
+        self._streams_lock = threading.Lock()
+
+        # Записи с flush=False, еще не зафиксированные COMMIT
+        self._pending_writes = 0
+        self._commit_timer: Optional[threading.Timer] = None
 
-        print(f"Database path: {self.db_path}")
-        print(f"Directory exists: {os.path.exists(os.path.dirname(self.db_path))}")
-        print(f"Directory writable: {os.access(os.path.dirname(self.db_path), os.W_OK)}")
+        # LRU-кэш строк чтения; поколение защищает от записи в кэш строки,
+        # прочитанной до изменения, которое завершилось во время чтения
+        self._row_cache: "OrderedDict[tuple, Optional[sqlite3.Row]]" = OrderedDict()
+        self._row_cache_lock = threading.Lock()
+        self._row_cache_generation = 0
 
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # Отложенные записи (flush=False) не должны теряться при выходе без
+        # явного close(); слабая ссылка не продлевает жизнь менеджера
+        atexit.register(_close_at_exit, weakref.ref(self))
 
-        self._init_database()
-        self.migrate_database()
+        self._enable_wal()
+        # Для актуальной базы вся проверка схемы - одно чтение PRAGMA user_version
+        schema_version = self._get_schema_version()
+        if schema_version < self.SCHEMA_VERSION:
+            if schema_version < self.BASE_SCHEMA_VERSION:
+                self._init_database()
+            self.migrate_database()
     
-    def _get_connection(self) -> sqlite3.Connection:
-        """Создает и возвращает соединение с базой данных"""
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Создает новое соединение с базой данных
+        
+        Args:
+            read_only: True - соединение открывается с mode=ro (для пула чтения):
+                       случайная запись через него завершится ошибкой, а не
+                       станет конкурировать с соединением для записи
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA foreign_keys = ON")
+            if read_only and self.db_path != ':memory:':
+                database, uri = Path(self.db_path).as_uri() + '?mode=ro', True
+            else:
+                database, uri = self.db_path, False
+            conn = sqlite3.connect(
+                database,
+                uri=uri,
+                check_same_thread=False,
+                cached_statements=self.STATEMENT_CACHE_SIZE
+            )
+            conn.executescript(self.CONNECTION_PRAGMAS)
             conn.row_factory = sqlite3.Row
             return conn
         except sqlite3.Error as e:
             logger.error(f"Ошибка подключения к базе данных: {e}")
             raise
     
+    @contextmanager
+    def _get_connection(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Выдает соединение из пула
+        
+        При выходе без ошибки открытая транзакция фиксируется, при ошибке -
+        откатывается (как у контекстного менеджера sqlite3.Connection).
+        
+        Args:
+            write: True - соединение для записи (эксклюзивно), False - для чтения
+        """
+        # У :memory: каждое соединение - своя база, поэтому используем одно
+        if write or self.db_path == ':memory:':
+            with self._writer_lock:
+                conn = self._get_writer()
+                # Отложенные записи фиксируем заранее, чтобы откат этой
+                # операции при ошибке их не затронул
+                if self._pending_writes:
+                    self._commit_pending()
+                try:
+                    yield conn
+                    if conn.in_transaction:
+                        conn.commit()
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+                finally:
+                    if write:
+                        self._invalidate_row_cache()
+            return
+
+        # Соединения для чтения не видят открытую транзакцию записи: отложенные
+        # записи (flush=False) фиксируем до чтения, иначе оно вернет старые данные
+        if self._pending_writes:
+            self.flush()
+
+        conn, pooled = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if pooled:
+                self._readers.put(conn)
+            else:
+                conn.close()
+    
+    def _get_writer(self) -> sqlite3.Connection:
+        """Возвращает соединение для записи (вызывается под _writer_lock)"""
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+    
+    @contextmanager
+    def _write_transaction(self, flush: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Транзакция записи
+        
+        Args:
+            flush: True - COMMIT сразу при выходе; False - изменения остаются
+                   в общей открытой транзакции и фиксируются пакетом (один fsync
+                   WAL на много записей) по таймеру, при заполнении пакета
+                   или при вызове flush(), а также перед любым чтением через
+                   этот менеджер. Другие процессы не видят их до фиксации.
+        """
+        # BEGIN IMMEDIATE берет блокировку записи сразу (с ожиданием по
+        # busy_timeout), а не при первом изменении посреди транзакции
+        if flush:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                yield conn
+            return
+        
+        with self._writer_lock:
+            conn = self._get_writer()
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            # Точка сохранения: ошибка откатывает только эту запись
+            conn.execute("SAVEPOINT deferred_write")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK TO deferred_write")
+                conn.execute("RELEASE deferred_write")
+                raise
+            conn.execute("RELEASE deferred_write")
+            # Изменение уже видно этому соединению (а для :memory: - всем
+            # чтениям); после COMMIT кэш сбрасывается еще раз
+            self._invalidate_row_cache()
+            
+            self._pending_writes += 1
+            if self._pending_writes >= self.DEFERRED_COMMIT_BATCH:
+                self._commit_pending()
+            elif self._commit_timer is None:
+                self._commit_timer = threading.Timer(self.DEFERRED_COMMIT_DELAY, self.flush)
+                self._commit_timer.daemon = True
+                self._commit_timer.start()
+    
+    def _commit_pending(self) -> None:
+        """Фиксирует отложенные записи (вызывается под _writer_lock)"""
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            self._commit_timer = None
+        if self._writer is not None and self._writer.in_transaction:
+            self._writer.commit()
+            self._invalidate_row_cache()
+        self._pending_writes = 0
+    
+    def _invalidate_row_cache(self) -> None:
+        """Сбрасывает LRU-кэш строк (после любой записи)"""
+        with self._row_cache_lock:
+            self._row_cache_generation += 1
+            self._row_cache.clear()
+    
+    def _cached_row(self, key: tuple, query: str, params: tuple) -> Optional[sqlite3.Row]:
+        """Читает одну строку через LRU-кэш (sqlite3.Row неизменяем, его можно отдавать повторно)"""
+        with self._row_cache_lock:
+            if key in self._row_cache:
+                self._row_cache.move_to_end(key)
+                return self._row_cache[key]
+            generation = self._row_cache_generation
+        
+        row = self.execute_query(query, params, fetch_one=True)
+        
+        with self._row_cache_lock:
+            if generation == self._row_cache_generation:
+                self._row_cache[key] = row
+                if len(self._row_cache) > self.ROW_CACHE_SIZE:
+                    self._row_cache.popitem(last=False)
+        return row
+    
+    def flush(self) -> None:
+        """Немедленно фиксирует записи, сделанные с flush=False"""
+        with self._writer_lock:
+            self._commit_pending()
+    
+    def _acquire_reader(self) -> Tuple[sqlite3.Connection, bool]:
+        """
+        Берет свободное соединение для чтения или создает новое, пока пул не заполнен
+        
+        Returns:
+            (соединение, True - из пула / False - временное, закрывается после чтения)
+        """
+        try:
+            return self._readers.get_nowait(), True
+        except queue.Empty:
+            pass
+        
+        with self._readers_lock:
+            create = self._readers_created < self.READER_POOL_SIZE
+            if create:
+                self._readers_created += 1
+        
+        if create:
+            try:
+                return self._connect(read_only=True), True
+            except sqlite3.Error:
+                with self._readers_lock:
+                    self._readers_created -= 1
+                raise
+        try:
+            return self._readers.get(timeout=self.READER_WAIT_TIMEOUT), True
+        except queue.Empty:
+            logger.warning("Reader pool exhausted (unfinished stream=True results?), "
+                           "using a temporary connection")
+            return self._connect(read_only=True), False
+    
+    def close(self) -> None:
+        """Закрывает все соединения пула (при следующем запросе они откроются заново)"""
+        # Недочитанные генераторы stream=True завершаются: их соединения
+        # возвращаются в пул и закрываются ниже вместе с остальными
+        with self._streams_lock:
+            streams = list(self._streams)
+            self._streams.clear()
+        for stream in streams:
+            try:
+                stream.close()
+            except ValueError:
+                # Генератор сейчас выполняется в другом потоке
+                logger.warning("Unfinished stream=True result is in use, its connection stays open")
+        
+        with self._writer_lock:
+            self._commit_pending()
+            if self._writer is not None:
+                # Рекомендуемый SQLite хук перед закрытием: пересобирает
+                # статистику только там, где она устарела
+                try:
+                    self._writer.execute("PRAGMA optimize")
+                except sqlite3.Error as e:
+                    logger.warning(f"PRAGMA optimize failed: {e}")
+                self._writer.close()
+                self._writer = None
+        
+        with self._readers_lock:
+            while True:
+                try:
+                    conn = self._readers.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._readers_created -= 1
+        
+        # После close() файл базы может быть заменен (восстановление из копии):
+        # строки из кэша к новой базе уже не относятся
+        self._invalidate_row_cache()
+    
+    def _enable_wal(self) -> None:
+        """Переводит базу в режим WAL (режим хранится в самом файле БД)"""
+        if self.db_path == ':memory:':
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+                if mode.lower() != 'wal':
+                    logger.warning(f"WAL mode is not available, journal_mode = {mode}")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Не удалось включить WAL: {e}")
+    
+    def _get_schema_version(self) -> int:
+        """Возвращает версию схемы из PRAGMA user_version"""
+        with self._get_connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
     def _init_database(self) -> None:
         """Инициализирует базу данных и создает таблицы"""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # 1. Сначала создаем Profiles (без Image и с новыми дефолтами)
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS Profiles (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Name TEXT NOT NULL UNIQUE,
-                        Description TEXT,
-                        Feed_rate REAL DEFAULT 30.0,
-                        Material_size TEXT DEFAULT '',
-                        Product_size TEXT DEFAULT '',
-                        pdf_path TEXT,
-                        Created_Date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-
-                # 2. Обязательно создаем material_sizes (она нужна для вариантов!)
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS material_sizes (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        width REAL NOT NULL,
-                        thickness REAL NOT NULL,
-                        name TEXT,
-                        description TEXT
-                    )
-                ''')
-                
-                # 3. Таблица вариантов продукта
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS product_size_variants (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        profile_id INTEGER NOT NULL,
-                        width REAL NOT NULL,
-                        thickness REAL NOT NULL,
-                        material_id INTEGER,
-                        is_default BOOLEAN DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (profile_id) REFERENCES Profiles (ID) ON DELETE CASCADE,
-                        FOREIGN KEY (material_id) REFERENCES material_sizes (id) ON DELETE SET NULL
-                    )
-                ''')
-                
-                # Индекс для быстрого поиска
-                cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_product_variants_profile 
-                    ON product_size_variants(profile_id)
-                ''')
-                
-                # Таблица инструментов
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS Tools (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Profile_ID INTEGER NOT NULL,
-                        Position TEXT,
-                        Tool_Type TEXT,
-                        Set_Number INTEGER DEFAULT 1,
-                        Auto_Generated_Code TEXT UNIQUE,
-                        Knives_Count INTEGER DEFAULT 6,
-                        Template_ID TEXT,
-                        Set_Status TEXT DEFAULT 'ready',
-                        Notes TEXT,
-                        Photo BLOB,
-                        FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE
-                    )
-                ''')
-                
-                # Проверяем наличие колонки Photo и добавляем её, если её нет
-                cursor.execute('''
-                    PRAGMA table_info(Tools)
-                ''')
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                if 'Photo' not in columns:
-                    cursor.execute('''
-                        ALTER TABLE Tools ADD COLUMN Photo BLOB
-                    ''')
-                    conn.commit()
+                # Схема уже создана - пропускаем все CREATE/ALTER
+                cursor.execute("PRAGMA user_version")
+                if cursor.fetchone()[0] >= self.BASE_SCHEMA_VERSION:
+                    return
                 
-                # Таблица шаблонов изображений инструментов
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS Tool_Image_Templates (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Profile_ID INTEGER NOT NULL,
-                        Position TEXT NOT NULL,
-                        Tool_Type TEXT NOT NULL,
-                        Image_Data BLOB NOT NULL,
-                        Created_Date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE,
-                        UNIQUE(Profile_ID, Position, Tool_Type)
-                    )
-                ''')
-                
-                # Таблица назначений инструментов на головы
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS Tool_Assignments (
-                        ID INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Profile_ID INTEGER NOT NULL,
-                        Tool_ID INTEGER NOT NULL,
-                        Head_Number INTEGER NOT NULL CHECK (Head_Number BETWEEN 1 AND 10),
-                        RPM INTEGER,
-                        Pass_Depth REAL,
-                        Work_Material TEXT,
-                        Remarks TEXT,
-                        FOREIGN KEY (Profile_ID) REFERENCES Profiles (ID) ON DELETE CASCADE,
-                        FOREIGN KEY (Tool_ID) REFERENCES Tools (ID) ON DELETE CASCADE,
-                        UNIQUE(Profile_ID, Head_Number)
-                    )
-                ''')
+                # Все таблицы - одним скриптом
+                cursor.executescript(self._BASE_SCHEMA_SQL)
                 
                 # Создание индексов
                 self._create_indexes(cursor)
+                cursor.execute(f"PRAGMA user_version = {self.BASE_SCHEMA_VERSION}")
                 conn.commit()
                 
         except sqlite3.Error as e:
@@ -172,46 +561,144 @@ class DatabaseManager:
             "CREATE INDEX IF NOT EXISTS idx_tools_profile ON Tools(Profile_ID)",
             "CREATE INDEX IF NOT EXISTS idx_tools_position ON Tools(Position)",
             "CREATE INDEX IF NOT EXISTS idx_tools_type ON Tools(Tool_Type)",
-            "CREATE INDEX IF NOT EXISTS idx_assignments_profile ON Tool_Assignments(Profile_ID)",
             "CREATE INDEX IF NOT EXISTS idx_assignments_tool ON Tool_Assignments(Tool_ID)",
-            "CREATE INDEX IF NOT EXISTS idx_assignments_head ON Tool_Assignments(Profile_ID, Head_Number)"
+            self._ASSIGNMENTS_COVERING_INDEX
         ]
         
-        for index in indexes:
-            try:
-                cursor.execute(index)
-            except sqlite3.Error as e:
-                logger.warning(f"Не удалось создать индекс: {e}")
+        try:
+            # Все индексы - одним скриптом
+            cursor.executescript(";\n".join(indexes) + ";")
+        except sqlite3.Error as e:
+            # Скрипт остановился на ошибке - создаем оставшиеся по одному
+            logger.warning(f"Не удалось создать индексы одним скриптом: {e}")
+            for index in indexes:
+                try:
+                    cursor.execute(index)
+                except sqlite3.Error as e:
+                    logger.warning(f"Не удалось создать индекс: {e}")
     
     def migrate_database(self):
-        """Миграция для добавления новых столбцов"""
+        """
+        Применяет миграции схемы
+        
+        Номер последней примененной миграции хранится в PRAGMA user_version,
+        поэтому каждая миграция выполняется один раз, а для актуальной базы
+        проверка сводится к чтению одного числа.
+        """
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute("PRAGMA user_version")
+                version = cursor.fetchone()[0]
+                if version >= self.SCHEMA_VERSION:
+                    return
                 
-                # Проверяем наличие столбцов
-                cursor.execute("PRAGMA table_info(Tools)")
-                columns = {col[1]: col for col in cursor.fetchall()}
+                # v2: Template_ID, Set_Status, Base_Code и фото наборов в Tool_Photos
+                if version < 2:
+                    # Проверяем наличие столбцов
+                    cursor.execute("PRAGMA table_info(Tools)")
+                    columns = {col[1]: col for col in cursor.fetchall()}
                 
-                # Добавляем Template_ID если нет
-                if 'Template_ID' not in columns:
-                    cursor.execute("ALTER TABLE Tools ADD COLUMN Template_ID TEXT")
-                    logger.info("Added Template_ID column to Tools table")
+                    # Добавляем Template_ID если нет
+                    if 'Template_ID' not in columns:
+                        cursor.execute("ALTER TABLE Tools ADD COLUMN Template_ID TEXT")
+                        logger.info("Added Template_ID column to Tools table")
                 
-                # Добавляем Set_Status если нет
-                if 'Set_Status' not in columns:
-                    cursor.execute("ALTER TABLE Tools ADD COLUMN Set_Status TEXT DEFAULT 'ready'")
-                    logger.info("Added Set_Status column to Tools table")
+                    # Добавляем Set_Status если нет
+                    if 'Set_Status' not in columns:
+                        cursor.execute("ALTER TABLE Tools ADD COLUMN Set_Status TEXT DEFAULT 'ready'")
+                        logger.info("Added Set_Status column to Tools table")
                 
+                    # Добавляем Base_Code (первые 5 цифр кода = набор) если нет:
+                    # поиск набора идет по равенству через индекс вместо LIKE
+                    if 'Base_Code' not in columns:
+                        cursor.execute("ALTER TABLE Tools ADD COLUMN Base_Code TEXT")
+                        cursor.execute("UPDATE Tools SET Base_Code = substr(Auto_Generated_Code, 1, 5)")
+                        logger.info("Added Base_Code column to Tools table")
+                    cursor.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_tools_profile_base ON Tools(Profile_ID, Base_Code)"
+                    )
+
+                    # Фото общее для всего набора - храним его один раз в Tool_Photos
+                    # (ключ - Base_Code), а не копию в каждой строке Tools
+                    cursor.execute('''
+                        CREATE TABLE IF NOT EXISTS Tool_Photos (
+                            Set_Code TEXT PRIMARY KEY,
+                            Image_Data BLOB
+                        )
+                    ''')
+                    if 'Photo' in columns:
+                        # Переносим фото первого инструмента каждого набора
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO Tool_Photos (Set_Code, Image_Data)
+                            SELECT Base_Code, Photo FROM Tools
+                            WHERE Photo IS NOT NULL
+                            ORDER BY ID
+                        ''')
+                        if cursor.rowcount > 0:
+                            logger.info(f"Moved {cursor.rowcount} set photos to Tool_Photos table")
+                        if _HAS_DROP_COLUMN:
+                            # Строки Tools сжимаются, страницы переполнения BLOB освобождаются
+                            cursor.execute("ALTER TABLE Tools DROP COLUMN Photo")
+                        else:
+                            # Без DROP COLUMN (SQLite < 3.35) столбец просто очищается
+                            cursor.execute("UPDATE Tools SET Photo = NULL WHERE Photo IS NOT NULL")
+
+                    # Фото удаляется вместе с последним инструментом набора
+                    # (в том числе при каскадном удалении профиля)
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS trg_tools_photo_delete
+                        AFTER DELETE ON Tools
+                        WHEN NOT EXISTS (SELECT 1 FROM Tools WHERE Base_Code = OLD.Base_Code)
+                        BEGIN
+                            DELETE FROM Tool_Photos WHERE Set_Code = OLD.Base_Code;
+                        END
+                    ''')
+                    cursor.execute('''
+                        CREATE TRIGGER IF NOT EXISTS trg_tools_photo_move
+                        AFTER UPDATE OF Base_Code ON Tools
+                        WHEN NOT EXISTS (SELECT 1 FROM Tools WHERE Base_Code = OLD.Base_Code)
+                        BEGIN
+                            DELETE FROM Tool_Photos WHERE Set_Code = OLD.Base_Code;
+                        END
+                    ''')
+
+                # v3: покрывающий индекс назначений вместо индексов (Profile_ID)
+                # и (Profile_ID, Head_Number) - их заменяет новый индекс и UNIQUE
+                if version < 3:
+                    cursor.execute("DROP INDEX IF EXISTS idx_assignments_profile")
+                    cursor.execute("DROP INDEX IF EXISTS idx_assignments_head")
+                    cursor.execute(self._ASSIGNMENTS_COVERING_INDEX)
+
+                cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
                 conn.commit()
+                
+                # Схема и индексы изменились - собираем статистику для
+                # планировщика (sqlite_stat1) один раз после миграции
+                cursor.execute("ANALYZE")
         except sqlite3.Error as e:
             logger.error(f"Error during database migration: {e}")
     
     def execute_query(self, query: str, params: tuple = (), 
-                     fetch_one: bool = False, commit: bool = False) -> Union[List[sqlite3.Row], sqlite3.Row, None]:
-        """Выполняет SQL-запрос к базе данных"""
+                     fetch_one: bool = False, commit: bool = False,
+                     stream: bool = False) -> Union[List[sqlite3.Row], sqlite3.Row, Iterator[sqlite3.Row], None]:
+        """
+        Выполняет SQL-запрос к базе данных
+        
+        stream=True возвращает генератор строк: они читаются пакетами по
+        STREAM_BATCH_SIZE, а соединение занято до конца перебора. Вызывающий
+        код обязан дочитать генератор или закрыть его (close()), иначе соединение
+        не вернется в пул; недочитанный генератор завершает и DatabaseManager.close()
+        (дальнейший перебор просто закончится).
+        """
+        if stream:
+            rows = self._stream_query(query, params)
+            with self._streams_lock:
+                self._streams.add(rows)
+            return rows
+        
         try:
-            with self._get_connection() as conn:
+            with self._get_connection(write=commit) as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 
@@ -227,25 +714,49 @@ class DatabaseManager:
             logger.error(f"Ошибка при выполнении запроса: {e}\nQuery: {query}\nParams: {params}")
             raise
     
+    def _stream_query(self, query: str, params: tuple) -> Iterator[sqlite3.Row]:
+        """Выдает строки результата запроса пакетами fetchmany"""
+        try:
+            with self._get_connection(write=False) as conn:
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(self.STREAM_BATCH_SIZE)
+                    if not rows:
+                        break
+                    yield from rows
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при выполнении запроса: {e}\nQuery: {query}\nParams: {params}")
+            raise
+    
     # CRUD методы для профилей
     def get_all_profiles(self) -> List[sqlite3.Row]:
         """Получает все профили"""
-        return self.execute_query('SELECT * FROM Profiles ORDER BY Name')
+        return self.execute_query(f'SELECT {PROFILE_COLUMNS} FROM Profiles ORDER BY Name')
+    
+    def get_profile_list(self) -> List[Tuple[int, str]]:
+        """Получает (ID, Name) всех профилей для списков интерфейса (кортежи без sqlite3.Row)"""
+        with self._get_connection(write=False) as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute('SELECT ID, Name FROM Profiles ORDER BY Name')
+            return cursor.fetchall()
     
     def get_profile(self, profile_id: int) -> Optional[sqlite3.Row]:
         """Получает профиль по ID"""
-        return self.execute_query(
+        # SELECT *: в старых базах у одного профиля читается и превью Image
+        return self._cached_row(
+            ('profile', profile_id),
             'SELECT * FROM Profiles WHERE ID = ?',
-            (profile_id,),
-            fetch_one=True
+            (profile_id,)
         )
     
     def add_profile(self, name: str, description: str = '', feed_rate: float = 30.0,
                    material_size: str = '', product_size: str = '',
-                   image_data: Optional[bytes] = None, pdf_path: Optional[str] = None) -> int:
+                   image_data: Optional[bytes] = None, pdf_path: Optional[str] = None,
+                   flush: bool = True) -> int:
         """Добавляет новый профиль (игнорируем image_data)"""
         try:
-            with self._get_connection() as conn:
+            with self._write_transaction(flush) as conn:
                 cursor = conn.cursor()
                 # Убираем Image из списка колонок и VALUES
                 cursor.execute('''
@@ -253,7 +764,6 @@ class DatabaseManager:
                     (Name, Description, Feed_rate, Material_size, Product_size, pdf_path)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (name, description, feed_rate, material_size, product_size, pdf_path))
-                conn.commit()
                 return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             if "UNIQUE" in str(e):
@@ -271,11 +781,9 @@ class DatabaseManager:
         }
         
         # Replace parameter names with column names in the query
-        set_clause = ", ".join([f"{column_mapping.get(key, key)} = ?" for key in kwargs.keys()])
-        params = list(kwargs.values())
-        params.append(profile_id)
+        values = {column_mapping.get(key, key): value for key, value in kwargs.items()}
+        query, params = _update_statement('Profiles', values, profile_id)
         
-        query = f"UPDATE Profiles SET {set_clause} WHERE ID = ?"
         result = self.execute_query(query, tuple(params), commit=True)
         return result is not None
     
@@ -289,67 +797,130 @@ class DatabaseManager:
         return result > 0
     
     # CRUD методы для инструментов
-    def get_tools_by_profile(self, profile_id: int) -> List[sqlite3.Row]:
-        """Получает инструменты профиля"""
+    def get_tools_by_profile(self, profile_id: int,
+                             stream: bool = False) -> Union[List[sqlite3.Row], Iterator[sqlite3.Row]]:
+        """Получает инструменты профиля (без данных фото, только Has_Photo)"""
         return self.execute_query(
-            'SELECT * FROM Tools WHERE Profile_ID = ? ORDER BY Auto_Generated_Code',
-            (profile_id,)
+            _TOOL_LIST_SELECT + ' WHERE t.Profile_ID = ? ORDER BY t.Auto_Generated_Code',
+            (profile_id,),
+            stream=stream
         )
-    
-    def get_tool(self, tool_id: int) -> Optional[sqlite3.Row]:
+
+    def get_tool(self, tool_id: int, with_photo: bool = True) -> Optional[sqlite3.Row]:
         """Получает инструмент по ID"""
-        return self.execute_query(
-            'SELECT * FROM Tools WHERE ID = ?',
-            (tool_id,),
-            fetch_one=True
-        )
+        return self._select_tool('t.ID = ?', (tool_id,), with_photo)
+
+    def get_tool_by_code(self, auto_generated_code: str,
+                         with_photo: bool = True) -> Optional[sqlite3.Row]:
+        """Получает инструмент по Auto_Generated_Code"""
+        return self._select_tool('t.Auto_Generated_Code = ?', (auto_generated_code,), with_photo)
+
+    def get_tool_by_template_id(self, template_id: str,
+                                with_photo: bool = True) -> Optional[sqlite3.Row]:
+        """Получает инструмент по Template_ID"""
+        return self._select_tool('t.Template_ID = ?', (template_id,), with_photo)
+
+    def _select_tool(self, where: str, params: tuple, with_photo: bool) -> Optional[sqlite3.Row]:
+        """Выбирает один инструмент; фото набора читается только при with_photo"""
+        if with_photo:
+            # Строки с BLOB не кэшируем
+            return self.execute_query(f'{_TOOL_FULL_SELECT} WHERE {where}', params, fetch_one=True)
+        return self._cached_row(('tool', where) + params, f'{_TOOL_LIST_SELECT} WHERE {where}', params)
 
     def get_tools_in_set(self, auto_generated_code: str) -> List[sqlite3.Row]:
         """Получает все инструменты в наборе по Auto_Generated_Code"""
         return self.execute_query(
-            'SELECT * FROM Tools WHERE Auto_Generated_Code = ?',
+            _TOOL_LIST_SELECT + ' WHERE t.Auto_Generated_Code = ?',
             (auto_generated_code,)
         )
+
+    def get_first_tool_id_in_set(self, profile_id: int, base_code: str) -> Optional[int]:
+        """ID первого инструмента набора (MIN(ID) берется из индекса idx_tools_profile_base без чтения строк)"""
+        row = self.execute_query(
+            "SELECT MIN(ID) FROM Tools WHERE Profile_ID = ? AND Base_Code = ?",
+            (profile_id, base_code), fetch_one=True
+        )
+        return row[0] if row else None
+
+    def get_tool_photo(self, tool_id: int) -> Optional[bytes]:
+        """Загружает фото набора инструмента по требованию"""
+        with self._get_connection(write=False) as conn:
+            row = conn.execute('''
+                SELECT p.rowid FROM Tools t
+                JOIN Tool_Photos p ON p.Set_Code = t.Base_Code
+                WHERE t.ID = ? AND p.Image_Data IS NOT NULL
+            ''', (tool_id,)).fetchone()
+            if row is None:
+                return None
+
+            # Connection.blobopen (Python 3.11+) читает BLOB напрямую, минуя строку результата
+            if hasattr(conn, 'blobopen'):
+                with conn.blobopen('Tool_Photos', 'Image_Data', row[0], readonly=True) as blob:
+                    return blob.read()
+            return conn.execute(
+                'SELECT Image_Data FROM Tool_Photos WHERE rowid = ?', (row[0],)
+            ).fetchone()[0]
     
     # Методы для назначений
-    def get_tool_assignments(self, profile_id: int) -> Dict[int, dict]:
-        """Получает назначения инструментов"""
-        assignments = {}
-        results = self.execute_query('''
-            SELECT ta.*, t.Auto_Generated_Code as Tool_Code
-            FROM Tool_Assignments ta
-            JOIN Tools t ON ta.Tool_ID = t.ID
-            WHERE ta.Profile_ID = ?
-            ORDER BY ta.Head_Number
-        ''', (profile_id,))
-        
-        for row in results:
-            assignments[row['Head_Number']] = dict(row)
-        
-        return assignments
+    def get_tool_assignments(self, profile_id: int) -> Dict[int, AssignmentRow]:
+        """Получает назначения инструментов профиля по номеру головы"""
+        with self._get_connection(write=False) as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _assignment_row_factory
+            cursor.execute('''
+                SELECT ta.ID, ta.Profile_ID, ta.Tool_ID, ta.Head_Number,
+                       ta.RPM, ta.Pass_Depth, ta.Work_Material, ta.Remarks,
+                       t.Auto_Generated_Code as Tool_Code
+                FROM Tool_Assignments ta
+                JOIN Tools t ON ta.Tool_ID = t.ID
+                WHERE ta.Profile_ID = ?
+                ORDER BY ta.Head_Number
+            ''', (profile_id,))
+            return {row.Head_Number: row for row in cursor.fetchall()}
     
     def assign_tool_to_head(self, profile_id: int, head_number: int, 
                            tool_id: int, rpm: int = None, pass_depth: float = None,
-                           work_material: str = '', remarks: str = '') -> bool:
+                           work_material: str = '', remarks: str = '',
+                           flush: bool = True) -> bool:
         """Назначает инструмент на голову"""
+        return self.assign_tools_bulk([{
+            'profile_id': profile_id,
+            'head_number': head_number,
+            'tool_id': tool_id,
+            'rpm': rpm,
+            'pass_depth': pass_depth,
+            'work_material': work_material,
+            'remarks': remarks
+        }], flush)
+
+    def assign_tools_bulk(self, assignments: List[Dict[str, Any]], flush: bool = True) -> bool:
+        """
+        Назначает несколько инструментов на головы одной транзакцией
+        
+        Args:
+            assignments: словари с ключами profile_id, head_number, tool_id
+                         и необязательными rpm, pass_depth, work_material, remarks
+            flush: False - отложить COMMIT (см. _write_transaction)
+        """
+        if not assignments:
+            return True
+        
+        rows = [(
+            a['profile_id'], a['tool_id'], a['head_number'],
+            a.get('rpm'), a.get('pass_depth'),
+            a.get('work_material', ''), a.get('remarks', '')
+        ) for a in assignments]
+        
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Удаляем старое назначение
-                cursor.execute('''
-                    DELETE FROM Tool_Assignments 
-                    WHERE Profile_ID = ? AND Head_Number = ?
-                ''', (profile_id, head_number))
-                
-                # Добавляем новое
-                cursor.execute('''
-                    INSERT INTO Tool_Assignments
+            with self._write_transaction(flush) as conn:
+                # UNIQUE(Profile_ID, Head_Number): REPLACE заменяет старое
+                # назначение головы одной операцией вместо DELETE + INSERT
+                conn.executemany('''
+                    INSERT OR REPLACE INTO Tool_Assignments
                     (Profile_ID, Tool_ID, Head_Number, RPM, Pass_Depth, Work_Material, Remarks)
                     VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (profile_id, tool_id, head_number, rpm, pass_depth, work_material, remarks))
-                
-                conn.commit()
+                ''', rows)
+
                 return True
                 
         except sqlite3.Error as e:
@@ -370,33 +941,31 @@ class DatabaseManager:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Get the Auto_Generated_Code of the tool being deleted
-                cursor.execute('''
-                    SELECT Auto_Generated_Code FROM Tools WHERE ID = ?
-                ''', (tool_id,))
-                result = cursor.fetchone()
+                # Delete the tool and get its code in one statement (SQLite 3.35+)
+                if _HAS_RETURNING:
+                    cursor.execute(
+                        'DELETE FROM Tools WHERE ID = ? RETURNING Auto_Generated_Code',
+                        (tool_id,)
+                    )
+                    # fetchall: statement must be finished before commit
+                    result = cursor.fetchall()
+                else:
+                    cursor.execute(
+                        'SELECT Auto_Generated_Code FROM Tools WHERE ID = ?',
+                        (tool_id,)
+                    )
+                    result = cursor.fetchall()
+                    if result:
+                        cursor.execute('DELETE FROM Tools WHERE ID = ?', (tool_id,))
                 
                 if not result:
                     logger.warning(f'Попытка удалить несуществующий инструмент с ID: {tool_id}')
                     return False
                 
-                auto_generated_code = result[0]
-                
-                # Delete the tool
-                cursor.execute('DELETE FROM Tools WHERE ID = ?', (tool_id,))
-                
-                # Check if there are any tools left in the set
-                cursor.execute('''
-                    SELECT COUNT(*) FROM Tools 
-                    WHERE Auto_Generated_Code = ?
-                ''', (auto_generated_code,))
-                
-                count = cursor.fetchone()[0]
-                if count == 0:
-                    logger.info(f'Все инструменты набора {auto_generated_code} удалены')
-                
+                # Опустевший набор обслуживает триггер trg_tools_photo_delete;
+                # отдельный подсчет оставшихся инструментов не нужен
                 conn.commit()
-                logger.info(f'Успешно удален инструмент с ID: {tool_id}')
+                logger.info(f'Успешно удален инструмент с ID: {tool_id}, код {result[0][0]}')
                 return True
                 
         except sqlite3.Error as e:
@@ -405,79 +974,165 @@ class DatabaseManager:
                 conn.rollback()
             return False
             
-    def add_tool(self, tool_data: Dict[str, Any]) -> int:
+    def add_tool(self, tool_data: Union[Dict[str, Any], tuple], flush: bool = True) -> int:
         """Добавляет инструмент и синхронизирует изображение с первым инструментом в наборе"""
-        required = ['Profile_ID', 'Position', 'Tool_Type', 'Auto_Generated_Code']
-        for field in required:
-            if field not in tool_data:
-                raise ValueError(f"Missing required field: {field}")
+        return self.add_tools_bulk([tool_data], flush)[0]
+
+    @staticmethod
+    def _tool_insert_values(tool_data: Union[Dict[str, Any], tuple]) -> tuple:
+        """Приводит данные инструмента к кортежу для вставки
+        
+        Принимает словарь (ключи как в Tool.to_dict) или кортеж Tool.to_row()
+        (порядок Tool.COLUMNS). Возвращает (Profile_ID, Position, Tool_Type,
+        Auto_Generated_Code, Knives_Count, Template_ID, Set_Status, Notes, Photo).
+        """
+        if isinstance(tool_data, dict):
+            for field in ('Profile_ID', 'Position', 'Tool_Type', 'Auto_Generated_Code'):
+                if field not in tool_data:
+                    raise ValueError(f"Missing required field: {field}")
+            values = (
+                tool_data['Profile_ID'],
+                tool_data['Position'],
+                tool_data['Tool_Type'],
+                tool_data['Auto_Generated_Code'],
+                tool_data.get('Knives_Count', 6),
+                tool_data.get('Template_ID'),
+                tool_data.get('Set_Status', 'ready'),
+                tool_data.get('Notes', ''),
+                tool_data.get('Photo')
+            )
+        else:
+            # Кортеж Tool.to_row(): ID и Set_Number не нужны (номер - из кода)
+            (_, profile_id, position, tool_type, _, auto_generated_code,
+             knives_count, template_id, set_status, notes, photo) = tool_data
+            values = (profile_id, position, tool_type, auto_generated_code,
+                      knives_count, template_id, set_status, notes, photo)
+        
+        if not isinstance(values[3], str) or not _TOOL_CODE_RE.fullmatch(values[3]):
+            raise ValueError("Auto_Generated_Code must be a 6-digit number")
+        return values
+
+    def add_tools_bulk(self, tools_data: List[Union[Dict[str, Any], tuple]],
+                       flush: bool = True) -> List[int]:
+        """
+        Добавляет несколько инструментов одной транзакцией
+        
+        Элементы tools_data - словари (как Tool.to_dict) или кортежи
+        Tool.to_row(); кортежи не требуют построения словаря на каждую запись.
+        
+        Фото хранится одно на набор (Tool_Photos): если у набора его еще нет,
+        используется первое фото из пакета, иначе переданное фото не меняет набор.
+        
+        Returns:
+            List[int]: ID добавленных инструментов в порядке tools_data
+        """
+        tools_values = [self._tool_insert_values(tool_data) for tool_data in tools_data]
+        
+        if not tools_values:
+            return []
 
         try:
-            with self._get_connection() as conn:
+            with self._write_transaction(flush) as conn:
                 cursor = conn.cursor()
+                if flush:
+                    # Своя транзакция: внешние ключи проверяются один раз при COMMIT,
+                    # а не на каждой строке (сбрасывается автоматически после COMMIT).
+                    # В общей отложенной транзакции не используем: нарушение
+                    # сорвало бы COMMIT чужих записей
+                    cursor.execute("PRAGMA defer_foreign_keys = ON")
 
-                # Check if the profile exists
-                cursor.execute('SELECT ID FROM Profiles WHERE ID = ?', (tool_data['Profile_ID'],))
-                if not cursor.fetchone():
-                    raise ValueError(f"Profile with ID {tool_data['Profile_ID']} does not exist")
+                # Check that all profiles exist (one query per batch)
+                profile_ids = list({values[0] for values in tools_values})
+                existing = set()
+                for chunk in self._chunks(profile_ids):
+                    cursor.execute(
+                        f"SELECT ID FROM Profiles WHERE ID IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    existing.update(row[0] for row in cursor.fetchall())
+                for profile_id in profile_ids:
+                    if profile_id not in existing:
+                        raise ValueError(f"Profile with ID {profile_id} does not exist")
 
-                # Extract the base code (first 5 digits) to find the set
-                auto_generated_code = tool_data['Auto_Generated_Code']
-                if len(auto_generated_code) != 6 or not auto_generated_code.isdigit():
-                    raise ValueError("Auto_Generated_Code must be a 6-digit number")
+                # Фото общее для набора (Base_Code = первые 5 цифр кода) и хранится
+                # в Tool_Photos; уже имеющееся фото набора не перезаписывается
+                # (INSERT OR IGNORE ниже), поэтому предварительная выборка не нужна
+                new_photos: Dict[str, bytes] = {}
+                rows = []
+                codes = []
+                for (profile_id, position, tool_type, auto_generated_code,
+                     knives_count, template_id, set_status, notes, photo) in tools_values:
+                    base_code = auto_generated_code[:5]
+                    codes.append(auto_generated_code)
                     
-                base_code = auto_generated_code[:5]
-                
-                # Check if this is the first tool in the set
-                cursor.execute('''
-                    SELECT ID, Photo 
-                    FROM Tools 
-                    WHERE Auto_Generated_Code LIKE ? 
-                    AND Profile_ID = ?
-                    ORDER BY ID
-                    LIMIT 1
-                ''', (f"{base_code}%", tool_data['Profile_ID']))
-                
-                first_tool = cursor.fetchone()
-                
-                # If there's a first tool in the set and it has a photo, use that photo
-                if first_tool and first_tool['Photo']:
-                    tool_data['Photo'] = first_tool['Photo']
-                    logger.info(f"Using photo from first tool in set {base_code}*")
-                elif 'Photo' not in tool_data:
-                    tool_data['Photo'] = None
-
-                # Insert the new tool
-                cursor.execute('''
+                    if photo:
+                        # Первое фото в пакете - кандидат в фото набора
+                        new_photos.setdefault(base_code, photo)
+
+                    rows.append((
+                        profile_id,
+                        position,
+                        tool_type,
+                        int(auto_generated_code[5]),  # Set number is the last digit
+                        auto_generated_code,
+                        base_code,
+                        knives_count,
+                        template_id,
+                        set_status,
+                        notes
+                    ))
+
+                # Insert the new tools
+                insert_sql = '''
                     INSERT INTO Tools 
                     (Profile_ID, Position, Tool_Type, Set_Number, Auto_Generated_Code,
-                    Knives_Count, Template_ID, Set_Status, Notes, Photo)
+                    Base_Code, Knives_Count, Template_ID, Set_Status, Notes)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    tool_data['Profile_ID'],
-                    tool_data['Position'],
-                    tool_data['Tool_Type'],
-                    int(auto_generated_code[5]),  # Set number is the last digit
-                    auto_generated_code,
-                    tool_data.get('Knives_Count', 6),
-                    tool_data.get('Template_ID'),
-                    tool_data.get('Set_Status', 'ready'),
-                    tool_data.get('Notes', ''),
-                    tool_data.get('Photo')
-                ))
+                '''
+                single_id = None
+                if len(rows) == 1:
+                    # Обычный add_tool: ID сразу из lastrowid, без повторного SELECT
+                    cursor.execute(insert_sql, rows[0])
+                    single_id = cursor.lastrowid
+                else:
+                    for chunk in self._chunks(rows):
+                        cursor.executemany(insert_sql, chunk)
+                if new_photos:
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO Tool_Photos (Set_Code, Image_Data) VALUES (?, ?)",
+                        new_photos.items()
+                    )
                 
-                tool_id = cursor.lastrowid
-                logger.info(f"Added new tool ID: {tool_id}, Code: {auto_generated_code}")
+                if single_id is not None:
+                    tool_ids = [single_id]
+                else:
+                    # executemany не возвращает ID - получаем их по уникальному коду
+                    ids_by_code = {}
+                    for chunk in self._chunks(codes):
+                        cursor.execute(
+                            f"SELECT ID, Auto_Generated_Code FROM Tools "
+                            f"WHERE Auto_Generated_Code IN ({','.join('?' * len(chunk))})",
+                            chunk
+                        )
+                        ids_by_code.update((row[1], row[0]) for row in cursor.fetchall())
+                    tool_ids = [ids_by_code[code] for code in codes]
                 
-                conn.commit()
-                return tool_id
+                for tool_id, code in zip(tool_ids, codes):
+                    logger.info(f"Added new tool ID: {tool_id}, Code: {code}")
+                
+                return tool_ids
 
         except sqlite3.Error as e:
             logger.error(f"Error adding tool: {e}")
-            if 'conn' in locals():
-                conn.rollback()
             raise
 
+    @staticmethod
+    def _chunks(items: List[Any], size: int = None) -> Iterator[List[Any]]:
+        """Делит список на пакеты (ограничение числа параметров SQLite)"""
+        size = size or DatabaseManager.BULK_BATCH_SIZE
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
     def update_tool(self, tool_id: int, tool_data: Dict[str, Any]) -> bool:
         """Обновляет данные инструмента с учетом логики кодов инструментов"""
         if not tool_data:
@@ -487,23 +1142,36 @@ class DatabaseManager:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
 
-                # 1. Получаем текущие данные (этот блок у вас уже есть)
-                cursor.execute('''
-                    SELECT ID, Auto_Generated_Code, Profile_ID, Photo 
-                    FROM Tools 
-                    WHERE ID = ?
-                ''', (tool_id,))
-                current = cursor.fetchone()
-                
-                if not current:
-                    logger.warning(f"Tool with ID {tool_id} not found")
-                    return False
-
-                new_code = tool_data.get('Auto_Generated_Code', current['Auto_Generated_Code'])
-                is_image_update = 'Photo' in tool_data
+                new_code = tool_data.get('Auto_Generated_Code')
+                # 'Photo': None - явное удаление фото набора; без ключа фото не трогаем
+                photo_given = 'Photo' in tool_data
                 photo_data = tool_data.get('Photo')
                 
-                # ... (пропускаем блок проверки фото, он остается прежним) ...
+                # 1. Текущий набор нужен только при смене кода или фото; для
+                # обычной правки полей существование проверяется по rowcount UPDATE
+                if new_code is not None or photo_given:
+                    cursor.execute('''
+                        SELECT Base_Code FROM Tools WHERE ID = ?
+                    ''', (tool_id,))
+                    current = cursor.fetchone()
+                    
+                    if not current:
+                        logger.warning(f"Tool with ID {tool_id} not found")
+                        return False
+
+                    new_base_code = new_code[:5] if new_code is not None else current['Base_Code']
+                    
+                    # Фото хранится одно на набор. При переходе в другой набор забираем
+                    # фото с собой, если у нового набора его нет (до UPDATE: триггер
+                    # удаляет фото опустевшего набора)
+                    if new_base_code != current['Base_Code']:
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO Tool_Photos (Set_Code, Image_Data)
+                            SELECT ?, Image_Data FROM Tool_Photos WHERE Set_Code = ?
+                        ''', (new_base_code, current['Base_Code']))
+                    tool_checked = True
+                else:
+                    tool_checked = False
 
                 # 2. А ВОТ ЗДЕСЬ НАЧИНАЮТСЯ ИЗМЕНЕНИЯ:
                 update_fields = []
@@ -523,30 +1191,60 @@ class DatabaseManager:
                 
                 for field, value in tool_data.items():
                     # Пропускаем код и фото, они обрабатываются отдельно
-                    if field.lower() in ['id', 'auto_generated_code', 'photo']:
+                    if field.lower() in ['id', 'auto_generated_code', 'base_code', 'photo']:
                         continue  
                     
                     # Ищем правильное имя колонки в нашей карте
                     db_column = column_mapping.get(field.lower(), field)
-                    update_fields.append(f"{db_column} = ?")
+                    update_fields.append(db_column)
                     params.append(value)
                 
                 # Добавляем обновление кода, если он изменился
                 if 'Auto_Generated_Code' in tool_data:
-                    update_fields.append("Auto_Generated_Code = ?")
+                    update_fields.append("Auto_Generated_Code")
                     params.append(tool_data['Auto_Generated_Code'])
+                    update_fields.append("Base_Code")
+                    params.append(tool_data['Auto_Generated_Code'][:5])
                 
                 # Выполняем обновление
                 if update_fields:
-                    query = f"""
-                        UPDATE Tools 
-                        SET {', '.join(update_fields)}
-                        WHERE ID = ?
-                    """
-                    params.append(tool_id)
-                    cursor.execute(query, params)
+                    cursor.execute(*_update_statement('Tools', dict(zip(update_fields, params)), tool_id))
+                    if cursor.rowcount == 0 and not tool_checked:
+                        logger.warning(f"Tool with ID {tool_id} not found")
+                        return False
                     logger.info(f"Updated tool {tool_id} with fields: {update_fields}")
 
+                # 3. Фото набора меняет только первый (MIN(ID)) инструмент набора;
+                # набор определяется уже после UPDATE, с учетом нового кода.
+                # Фото сравнивается с сохраненным на стороне SQLite (BLOB не читается)
+                if photo_given:
+                    cursor.execute('''
+                        SELECT t.Base_Code, MIN(s.ID) AS First_ID,
+                               (SELECT p.Image_Data FROM Tool_Photos p
+                                WHERE p.Set_Code = t.Base_Code) IS ? AS Unchanged
+                        FROM Tools t
+                        JOIN Tools s ON s.Profile_ID = t.Profile_ID AND s.Base_Code = t.Base_Code
+                        WHERE t.ID = ?
+                    ''', (photo_data, tool_id))
+                    photo_set = cursor.fetchone()
+                    if photo_set['Unchanged']:
+                        # Обычное сохранение формы: фото то же, менять нечего
+                        pass
+                    elif photo_set['First_ID'] != tool_id:
+                        logger.warning(f"Photo of set {photo_set['Base_Code']} not changed: "
+                                       f"tool {tool_id} is not the first tool in the set")
+                    elif photo_data is None:
+                        cursor.execute('DELETE FROM Tool_Photos WHERE Set_Code = ?',
+                                       (photo_set['Base_Code'],))
+                    else:
+                        # Новое фото заменяет фото набора одним upsert; неизмененный
+                        # BLOB не перезаписывается
+                        cursor.execute('''
+                            INSERT INTO Tool_Photos (Set_Code, Image_Data) VALUES (?, ?)
+                            ON CONFLICT(Set_Code) DO UPDATE SET Image_Data = excluded.Image_Data
+                            WHERE Image_Data IS NOT excluded.Image_Data
+                        ''', (photo_set['Base_Code'], photo_data))
+
                 conn.commit()
                 return True
 
@@ -556,15 +1254,16 @@ class DatabaseManager:
                 conn.rollback()
             return False
             
-    def add_material_size(self, width: float, thickness: float, name: str, description: str) -> int:
+    def add_material_size(self, width: float, thickness: float, name: str, description: str,
+                          flush: bool = True) -> int:
         """Добавляет новый типоразмер заготовки в базу данных"""
         query = '''
             INSERT INTO material_sizes (width, thickness, name, description)
             VALUES (?, ?, ?, ?)
         '''
         try:
-            # Используем твой существующий метод execute_query
-            return self.execute_query(query, (width, thickness, name, description), commit=True)
+            with self._write_transaction(flush) as conn:
+                return conn.execute(query, (width, thickness, name, description)).rowcount
         except sqlite3.Error as e:
             logger.error(f"Database error adding material: {e}")
             raise
\ No newline at end of file
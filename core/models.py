@@ -1,10 +1,61 @@
 # core/models.py
 
+import sys
+import logging
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Iterable
 from datetime import datetime
+from os.path import exists as _path_exists
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# __slots__ у dataclass (без __dict__ на экземпляр) доступны с Python 3.10;
+# на более старых версиях модели остаются обычными dataclass
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@lru_cache(maxsize=1024)
+def _parse_ts(value: str) -> datetime:
+    """datetime.fromisoformat с кэшем: строки одной пакетной вставки имеют одну метку времени"""
+    return datetime.fromisoformat(value)
+
+
+def _row_dict(row, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+    """sqlite3.Row -> dict одним проходом по значениям
+    
+    row[key] по имени ищет столбец линейным сравнением без учета регистра,
+    поэтому значения берутся итерацией строки. keys можно получить один раз
+    на всю выборку (у всех строк одного запроса они одинаковые).
+    """
+    return dict(zip(keys if keys is not None else row.keys(), row))
+
+
+def _intern_str(value):
+    """sys.intern для строк из БД (повторяющиеся значения делят один объект)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _pad_row(row, defaults: tuple) -> tuple:
+    """Позиционная строка, дополненная значениями по умолчанию до len(defaults)
+    
+    Одна распаковка вместо проверки len(row) на каждое поле.
+    """
+    values = tuple(row)[:len(defaults)]
+    return values + defaults[len(values):]
+
+
+# Ложные значения флагов INTEGER из SQLite (0/NULL); 0.0 и False совпадают с 0
+_FALSY_FLAGS = frozenset((0, None, ''))
+
+# Значения по умолчанию для позиционных строк (порядок столбцов выборки)
+_MATERIAL_SIZE_DEFAULTS = (None, None, None, None, '', True, None)
+_PRODUCT_VARIANT_DEFAULTS = (None, 0, 0.0, None, 0.5, '', False, 0)
+_PROFILE_DEFAULTS = (None, "", "", 2.5, "100x100", "90x90", None, None, None)
+_TOOL_DEFAULTS = (None, 0, "Bottom", "Profile", 1, "", 6, None, "ready", "", None)
+
+
+@dataclass(**_SLOTS)
 class MaterialSize:
     """Справочник размеров материала"""
     id: Optional[int] = None
@@ -20,14 +71,11 @@ class MaterialSize:
     
     def display_name(self):
         """Форматированное отображение для UI"""
-        parts = []
-        if self.width:
-            parts.append(f"W:{self.width}")
-        if self.thickness:
-            parts.append(f"T:{self.thickness}")
-        if self.length:
-            parts.append(f"L:{self.length}")
-        return " × ".join(parts)
+        return " × ".join(part for part in (
+            f"W:{self.width}" if self.width else None,
+            f"T:{self.thickness}" if self.thickness else None,
+            f"L:{self.length}" if self.length else None,
+        ) if part)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database"""
@@ -45,28 +93,30 @@ class MaterialSize:
     def from_db_row(cls, row) -> 'MaterialSize':
         """Create from database row"""
         if hasattr(row, 'keys'):  # sqlite3.Row
-            row_dict = {key: row[key] for key in row.keys()}
+            row_dict = _row_dict(row)
             return cls(
                 id=row_dict.get('id'),
                 width=row_dict.get('width'),
                 thickness=row_dict.get('thickness'),
                 length=row_dict.get('length'),
                 description=row_dict.get('description', ''),
-                is_active=bool(row_dict.get('is_active', True)),
-                created_at=datetime.fromisoformat(row_dict['created_at']) if row_dict.get('created_at') else None
+                is_active=row_dict.get('is_active', 1) not in _FALSY_FLAGS,
+                created_at=_parse_ts(row_dict['created_at']) if row_dict.get('created_at') else None
             )
         else:  # tuple
+            id_, width, thickness, length, description, is_active, created_at = \
+                _pad_row(row, _MATERIAL_SIZE_DEFAULTS)
             return cls(
-                id=row[0] if len(row) > 0 else None,
-                width=row[1] if len(row) > 1 else None,
-                thickness=row[2] if len(row) > 2 else None,
-                length=row[3] if len(row) > 3 else None,
-                description=row[4] if len(row) > 4 else '',
-                is_active=bool(row[5]) if len(row) > 5 else True,
-                created_at=datetime.fromisoformat(row[6]) if len(row) > 6 and row[6] else None
+                id=id_,
+                width=width,
+                thickness=thickness,
+                length=length,
+                description=description,
+                is_active=is_active not in _FALSY_FLAGS,
+                created_at=_parse_ts(created_at) if created_at else None
             )
 
-@dataclass
+@dataclass(**_SLOTS)
 class ProductSizeVariant:
     """Вариант размера продукта"""
     id: Optional[int] = None
@@ -105,7 +155,7 @@ class ProductSizeVariant:
     def from_db_row(cls, row) -> 'ProductSizeVariant':
         """Create from database row"""
         if hasattr(row, 'keys'):  # sqlite3.Row
-            row_dict = {key: row[key] for key in row.keys()}
+            row_dict = _row_dict(row)
             return cls(
                 id=row_dict.get('id'),
                 profile_id=row_dict.get('profile_id', 0),
@@ -113,22 +163,24 @@ class ProductSizeVariant:
                 thickness=row_dict.get('thickness'),
                 tolerance=row_dict.get('tolerance', 0.5),
                 notes=row_dict.get('notes', ''),
-                is_default=bool(row_dict.get('is_default', False)),
+                is_default=row_dict.get('is_default', 0) not in _FALSY_FLAGS,
                 order=row_dict.get('order', 0)
             )
         else:  # tuple
+            id_, profile_id, width, thickness, tolerance, notes, is_default, order = \
+                _pad_row(row, _PRODUCT_VARIANT_DEFAULTS)
             return cls(
-                id=row[0] if len(row) > 0 else None,
-                profile_id=row[1] if len(row) > 1 else 0,
-                width=row[2] if len(row) > 2 else 0.0,
-                thickness=row[3] if len(row) > 3 else None,
-                tolerance=row[4] if len(row) > 4 else 0.5,
-                notes=row[5] if len(row) > 5 else '',
-                is_default=bool(row[6]) if len(row) > 6 else False,
-                order=row[7] if len(row) > 7 else 0
+                id=id_,
+                profile_id=profile_id,
+                width=width,
+                thickness=thickness,
+                tolerance=tolerance,
+                notes=notes,
+                is_default=is_default not in _FALSY_FLAGS,
+                order=order
             )
 
-@dataclass
+@dataclass(**_SLOTS)
 class Profile:
     """Модель профиля"""
     id: Optional[int] = None
@@ -137,13 +189,17 @@ class Profile:
     feed_rate: Optional[float] = None
     material_size: Optional[str] = None  # старое поле для обратной совместимости
     product_size: Optional[str] = None  # старое поле для обратной совместимости
-    image_data: Optional[bytes] = None  # Превью PDF (первая страница)
+    image_data: Any = None  # Превью PDF (первая страница); str из старых баз кодируется в get_preview
     pdf_path: Optional[str] = None      # Путь к PDF файлу
     
     # Новые поля (временные, не в БД пока)
     material_size_id: Optional[int] = None
     material_size_obj: Optional[MaterialSize] = None
     product_variants: List[ProductSizeVariant] = field(default_factory=list)
+    # Индекс варианта по умолчанию в product_variants (см. set_variants)
+    _default_idx: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # (список вариантов, строка для product_sizes_display), сбрасывается в set_variants
+    _sizes_display: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def material_size_display(self):
@@ -155,15 +211,21 @@ class Profile:
     @property
     def product_sizes_display(self):
         """Для обратной совместимости"""
-        if self.product_variants:
-            return "; ".join([v.display_name() for v in self.product_variants])
-        return self.product_size or ""
+        variants = self.product_variants
+        if not variants:
+            return self.product_size or ""
+        cached = self._sizes_display
+        # Кэш действителен для того же объекта списка (после присваивания пересобирается)
+        if cached is None or cached[0] is not variants:
+            cached = self._sizes_display = (
+                variants, "; ".join([v.display_name() for v in variants])
+            )
+        return cached[1]
     
     @property
     def has_pdf(self) -> bool:
         """Проверяет, есть ли у профиля PDF файл"""
-        import os
-        return self.pdf_path is not None and os.path.exists(self.pdf_path)
+        return self.pdf_path is not None and _path_exists(self.pdf_path)
     
     @property
     def has_preview(self) -> bool:
@@ -171,15 +233,38 @@ class Profile:
         return self.image_data is not None
     
     def get_preview(self) -> Optional[bytes]:
-        """Получает изображение для превью"""
+        """Получает изображение для превью
+        
+        Старые базы возвращают BLOB как TEXT; перекодировка в bytes
+        выполняется здесь, при первом обращении, а не при загрузке профиля.
+        """
+        if isinstance(self.image_data, str):
+            try:
+                self.image_data = self.image_data.encode('latin-1')
+            except UnicodeEncodeError as e:
+                logger.warning(f"Could not encode image_data string: {e}")
+                self.image_data = None
         return self.image_data
     
+    def set_variants(self, variants: List[ProductSizeVariant]):
+        """Устанавливает варианты размеров и запоминает индекс варианта по умолчанию"""
+        self.product_variants = variants
+        self._sizes_display = None
+        self._default_idx = next(
+            (i for i, variant in enumerate(variants) if variant.is_default), None
+        )
+    
     def get_default_product_size(self) -> Optional[ProductSizeVariant]:
         """Получить вариант размера по умолчанию"""
-        for variant in self.product_variants:
-            if variant.is_default:
-                return variant
-        return self.product_variants[0] if self.product_variants else None
+        variants = self.product_variants
+        idx = self._default_idx
+        # Список могли изменить напрямую - тогда индекс пересчитывается
+        if idx is None or idx >= len(variants) or not variants[idx].is_default:
+            self.set_variants(variants)
+            idx = self._default_idx
+        if idx is not None:
+            return variants[idx]
+        return variants[0] if variants else None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database"""
@@ -190,67 +275,62 @@ class Profile:
             'feed_rate': self.feed_rate,
             'material_size': self.material_size,  # старое поле
             'product_size': self.product_size,    # старое поле
-            'image_data': self.image_data,
+            'image_data': self.get_preview(),
             'pdf_path': self.pdf_path
         }
     
     @classmethod
-    def from_db_row(cls, row) -> 'Profile':
+    def from_db_rows(cls, rows: Iterable) -> List['Profile']:
+        """Create profiles from a whole result set (имена столбцов читаются один раз)"""
+        profiles = []
+        keys = None
+        for row in rows:
+            if keys is None and hasattr(row, 'keys'):
+                keys = row.keys()
+            profiles.append(cls.from_db_row(row, keys))
+        return profiles
+    
+    @classmethod
+    def from_db_row(cls, row, keys: Optional[List[str]] = None) -> 'Profile':
         """Create from database row"""
-        # Преобразуем row в словарь если это sqlite3.Row
-        if hasattr(row, 'keys'):
-            row_dict = {key: row[key] for key in row.keys()}
-            
-            image_data = row_dict.get('Image') or row_dict.get('image_data')
-            pdf_path = row_dict.get('pdf_path')
-            
-            if image_data is not None and isinstance(image_data, str):
-                try:
-                    image_data = image_data.encode('latin-1')
-                except Exception as e:
-                    print(f"Warning: Could not encode image_data string: {e}")
-                    image_data = None
-            
-            return cls(
-                id=row_dict.get('ID'),
-                name=row_dict.get('Name', ""),
-                description=row_dict.get('Description', ""),
-                feed_rate=row_dict.get('Feed_rate', 2.5),
-                material_size=row_dict.get('Material_size', "100x100"),
-                product_size=row_dict.get('Product_size', "90x90"),
-                image_data=image_data,
-                pdf_path=pdf_path
-            )
-        else:
-            image_data = None
-            if len(row) > 6 and row[6]:
-                image_data = row[6]
-            elif len(row) > 8 and row[8]:
-                image_data = row[8]
-            
-            if image_data is not None and isinstance(image_data, str):
-                try:
-                    image_data = image_data.encode('latin-1')
-                except Exception as e:
-                    print(f"Warning: Could not encode image_data string: {e}")
-                    image_data = None
-            
-            pdf_path = None
-            if len(row) > 8:
-                pdf_path = row[8]
-            
-            return cls(
-                id=row[0] if len(row) > 0 else None,
-                name=row[1] if len(row) > 1 else "",
-                description=row[2] if len(row) > 2 else "",
-                feed_rate=row[3] if len(row) > 3 else 2.5,
-                material_size=row[4] if len(row) > 4 else "100x100",
-                product_size=row[5] if len(row) > 5 else "90x90",
-                image_data=image_data,
-                pdf_path=pdf_path
-            )
+        # Соединения DatabaseManager отдают sqlite3.Row; кортежи - устаревший путь
+        if keys is not None or hasattr(row, 'keys'):
+            return cls._from_row(row, keys)
+        return cls._from_tuple(row)
+    
+    @classmethod
+    def _from_row(cls, row, keys: Optional[List[str]] = None) -> 'Profile':
+        """Create from sqlite3.Row (основной путь)"""
+        row_dict = _row_dict(row, keys)
+        return cls(
+            id=row_dict.get('ID'),
+            name=row_dict.get('Name', ""),
+            description=row_dict.get('Description', ""),
+            feed_rate=row_dict.get('Feed_rate', 2.5),
+            material_size=row_dict.get('Material_size', "100x100"),
+            product_size=row_dict.get('Product_size', "90x90"),
+            # Image есть только в старых базах и только в SELECT *
+            image_data=row_dict.get('Image') or row_dict.get('image_data'),
+            pdf_path=row_dict.get('pdf_path')
+        )
+    
+    @classmethod
+    def _from_tuple(cls, row) -> 'Profile':
+        """Create from a positional tuple (устаревший формат строк)"""
+        id_, name, description, feed_rate, material_size, product_size, image, _, pdf_path = \
+            _pad_row(row, _PROFILE_DEFAULTS)
+        return cls(
+            id=id_,
+            name=name,
+            description=description,
+            feed_rate=feed_rate,
+            material_size=material_size,
+            product_size=product_size,
+            image_data=image or pdf_path or None,
+            pdf_path=pdf_path
+        )
 
-@dataclass
+@dataclass(**_SLOTS)
 class Tool:
     """Модель инструмента"""
     id: Optional[int] = None
@@ -264,6 +344,12 @@ class Tool:
     status: str = "ready"
     notes: str = ""
     photo: Optional[bytes] = None
+    has_photo: bool = False  # фото набора есть в БД (photo может быть не загружено)
+
+    # Порядок значений to_row() (ключи to_dict)
+    COLUMNS = ('ID', 'Profile_ID', 'Position', 'Tool_Type', 'Set_Number',
+               'Auto_Generated_Code', 'Knives_Count', 'Template_ID', 'Set_Status',
+               'Notes', 'Photo')
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database"""
@@ -281,24 +367,38 @@ class Tool:
             'Photo': self.photo
         }
     
+    def to_row(self) -> tuple:
+        """Values in COLUMNS order (для пакетной записи без построения словаря)"""
+        return (self.id, self.profile_id, self.position, self.tool_type, self.set_number,
+                self.code, self.knives_count, self.template_id, self.status,
+                self.notes, self.photo)
+    
     @classmethod
     def from_db_row(cls, row) -> 'Tool':
         """Create from database row"""
-        return cls(
-            id=row[0] if len(row) > 0 else None,
-            profile_id=row[1] if len(row) > 1 else 0,
-            position=row[2] if len(row) > 2 else "Bottom",
-            tool_type=row[3] if len(row) > 3 else "Profile",
-            set_number=row[4] if len(row) > 4 else 1,
-            code=row[5] if len(row) > 5 else "",
-            knives_count=row[6] if len(row) > 6 else 6,
-            template_id=row[7] if len(row) > 7 else None,
-            status=row[8] if len(row) > 8 else "ready",
-            notes=row[9] if len(row) > 9 else "",
-            photo=row[10] if len(row) > 10 else None
-        )
+        values = tuple(row)
+        if len(values) > 11:
+            has_photo = bool(values[11])
+            values = values[:11]
+        else:
+            # Без столбца Has_Photo признак берется из самого фото
+            values += _TOOL_DEFAULTS[len(values):]
+            has_photo = values[10] is not None
+        (id_, profile_id, position, tool_type, set_number, code,
+         knives_count, template_id, status, notes, photo) = values
+        # Позиция, тип и статус принимают несколько значений - интернируем,
+        # чтобы все инструменты ссылались на одни и те же строки
+        return cls(id_, profile_id, _intern_str(position), _intern_str(tool_type),
+                   set_number, code, knives_count, template_id, _intern_str(status),
+                   notes, photo, has_photo)
+    
+    @classmethod
+    def from_db_rows(cls, rows: Iterable) -> List['Tool']:
+        """Create tools from a whole result set"""
+        from_db_row = cls.from_db_row
+        return [from_db_row(row) for row in rows]
 
-@dataclass
+@dataclass(**_SLOTS)
 class ToolAssignment:
     """Модель назначения инструмента на голову"""
     id: Optional[int] = None
@@ -1,43 +1,76 @@
 """
 Паттерн Observer для уведомлений между компонентами
 """
-from typing import Callable, List, Dict, Any
+from typing import Callable, Dict, Any
 import logging
+import weakref
 
 logger = logging.getLogger(__name__)
 
+
+def _observer_key(observer: Callable) -> Any:
+    """Ключ наблюдателя: для bound method - (id объекта, функция)
+
+    Каждое обращение self.method создает новый объект bound method, поэтому
+    id(observer) как ключ не подходит; сам bound method как ключ держал бы
+    объект (например, окно) сильной ссылкой.
+    """
+    owner = getattr(observer, '__self__', None)
+    func = getattr(observer, '__func__', None)
+    if owner is not None and func is not None:
+        return (id(owner), func)
+    return observer
+
+
 class Observable:
     """Базовый класс для наблюдаемых объектов"""
-    
+
     def __init__(self):
-        self._observers: Dict[str, List[Callable]] = {}
-    
+        # event_type -> {ключ наблюдателя: наблюдатель или WeakMethod}
+        self._observers: Dict[str, Dict[Any, Any]] = {}
+
     def add_observer(self, event_type: str, observer: Callable):
         """Добавляет наблюдателя для определенного события"""
-        if event_type not in self._observers:
-            self._observers[event_type] = []
-        self._observers[event_type].append(observer)
-        logger.debug(f"Added observer for event '{event_type}': {observer}")
-    
+        observers = self._observers.setdefault(event_type, {})
+        key = _observer_key(observer)
+        if key is observer:
+            observers[key] = observer
+        else:
+            # Методы объектов храним слабо: удаленный объект сам выписывается
+            observers[key] = weakref.WeakMethod(
+                observer, lambda ref, observers=observers, key=key: observers.pop(key, None)
+            )
+        logger.debug("Added observer for event '%s': %s", event_type, observer)
+
     def remove_observer(self, event_type: str, observer: Callable):
         """Удаляет наблюдателя"""
-        if event_type in self._observers and observer in self._observers[event_type]:
-            self._observers[event_type].remove(observer)
-            logger.debug(f"Removed observer for event '{event_type}': {observer}")
-    
+        observers = self._observers.get(event_type)
+        if observers and observers.pop(_observer_key(observer), None) is not None:
+            logger.debug("Removed observer for event '%s': %s", event_type, observer)
+
     def notify_observers(self, event_type: str, *args, **kwargs):
         """Уведомляет всех наблюдателей о событии"""
-        if event_type in self._observers:
-            for observer in self._observers[event_type]:
-                try:
-                    observer(*args, **kwargs)
-                except Exception as e:
-                    logger.error(f"Error in observer for event '{event_type}': {e}")
-    
+        # Один поиск в словаре; без подписчиков - сразу выходим
+        observers = self._observers.get(event_type)
+        if not observers:
+            return
+        # Копия: наблюдатель может подписаться или отписаться во время уведомления
+        for entry in tuple(observers.values()):
+            if isinstance(entry, weakref.WeakMethod):
+                observer = entry()
+                if observer is None:
+                    continue
+            else:
+                observer = entry
+            try:
+                observer(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error in observer for event '{event_type}': {e}")
+
     def clear_observers(self, event_type: str = None):
         """Очищает всех наблюдателей"""
         if event_type:
             if event_type in self._observers:
                 self._observers[event_type].clear()
         else:
-            self._observers.clear()
\ No newline at end of file
+            self._observers.clear()
@@ -1,22 +1,32 @@
 """
 Генерация и декодирование кодов инструментов
 """
-from typing import Dict, Optional
+from collections import namedtuple
+from typing import Optional
+
+# Маппинги для кодирования (имя -> цифра) и декодирования (цифра -> имя).
+# Раздельные словари: в generate() цифры '1'..'4' не проходят как позиция
+_POS_ENCODE = {'Bottom': '1', 'Top': '2', 'Right': '3', 'Left': '4'}
+_POS_DECODE = {code: name for name, code in _POS_ENCODE.items()}
+
+_TYPE_ENCODE = {'Straight': '0', 'Profile': '1'}
+_TYPE_DECODE = {code: name for name, code in _TYPE_ENCODE.items()}
+
+# Готовые фрагменты кода: ID профиля (3 цифры) и номер комплекта по индексу,
+# чтобы generate() только склеивал строки без форматирования
+_PROFILE_CODES = tuple(f"{profile_id:03d}" for profile_id in range(1000))
+_SET_CODES = tuple(str(set_number) for set_number in range(10))
+
+# Обратная таблица для decode(): "001".."999" -> 1..999 (без int() по срезу)
+_PROFILE_DECODE = {code: profile_id for profile_id, code in enumerate(_PROFILE_CODES)}
+_SET_DIGITS = {code: set_number for set_number, code in enumerate(_SET_CODES)}
+
+# Результат decode(); словарь при необходимости - через _asdict()
+DecodedTool = namedtuple('DecodedTool', 'position tool_type profile_id set_number')
 
 class ToolCodeGenerator:
     """Генератор и декодер кодов инструментов"""
     
-    # Маппинги для кодирования
-    POSITION_MAP = {
-        'Bottom': '1', 'Top': '2', 'Right': '3', 'Left': '4',
-        '1': 'Bottom', '2': 'Top', '3': 'Right', '4': 'Left'
-    }
-    
-    TYPE_MAP = {
-        'Straight': '0', 'Profile': '1',
-        '0': 'Straight', '1': 'Profile'
-    }
-    
     @classmethod
     def generate(cls, profile_id: int, position: str, 
                 tool_type: str, set_number: int = 1) -> str:
@@ -32,40 +42,37 @@ class ToolCodeGenerator:
         if not 1 <= profile_id <= 999:
             raise ValueError(f"Profile ID must be 1-999, got {profile_id}")
         
-        if position not in cls.POSITION_MAP:
+        if position not in _POS_ENCODE:
             raise ValueError(f"Invalid position: {position}")
         
-        if tool_type not in cls.TYPE_MAP:
+        if tool_type not in _TYPE_ENCODE:
             raise ValueError(f"Invalid tool type: {tool_type}")
         
         if not 1 <= set_number <= 9:
             raise ValueError(f"Set number must be 1-9, got {set_number}")
         
-        # Генерация кода
-        pos_code = cls.POSITION_MAP[position]
-        type_code = cls.TYPE_MAP[tool_type]
-        profile_code = f"{profile_id:03d}"
-        set_code = str(set_number)
-        
-        return f"{pos_code}{type_code}{profile_code}{set_code}"
+        # Генерация кода из готовых фрагментов
+        return (_POS_ENCODE[position] + _TYPE_ENCODE[tool_type]
+                + _PROFILE_CODES[profile_id] + _SET_CODES[set_number])
     
     @classmethod
-    def decode(cls, code: str) -> Optional[Dict[str, any]]:
+    def decode(cls, code: str) -> Optional[DecodedTool]:
         """
         Декодирует код инструмента
         """
         if not code or len(code) != 6:
             return None
         
-        try:
-            return {
-                'position': cls.POSITION_MAP.get(code[0], 'Bottom'),
-                'tool_type': cls.TYPE_MAP.get(code[1], 'Profile'),
-                'profile_id': int(code[2:5]),
-                'set_number': int(code[5])
-            }
-        except (ValueError, IndexError):
+        profile_id = _PROFILE_DECODE.get(code[2:5])
+        if profile_id is None or code[5] not in _SET_DIGITS:
             return None
+        
+        return DecodedTool(
+            _POS_DECODE.get(code[0], 'Bottom'),
+            _TYPE_DECODE.get(code[1], 'Profile'),
+            profile_id,
+            _SET_DIGITS[code[5]]
+        )
     
     @classmethod
     def validate_code(cls, code: str) -> bool:
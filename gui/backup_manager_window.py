@@ -2,20 +2,57 @@
 Backup Manager Window
 """
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 import logging
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from gui.base.dialogs import ProgressDialog, show_error, show_info, show_warning, ask_yesno
+
 logger = logging.getLogger(__name__)
 
+# Общий пул для файловых операций с бэкапами: потоки создаются один раз
+# (по первому заданию) и переиспользуются всеми окнами менеджера
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backup-io")
+
+
+def _open_folder(path: str):
+    """Открывает папку в файловом менеджере отдельным (отсоединенным) процессом"""
+    if os.name == 'nt':  # Windows
+        # explorer вместо os.startfile: тот синхронно ждет обработчики оболочки
+        subprocess.Popen(
+            ['explorer', path],
+            creationflags=getattr(subprocess, 'DETACHED_PROCESS', 0)
+        )
+    else:  # Linux/Mac
+        subprocess.Popen(
+            ['xdg-open', path],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
 class BackupManagerWindow:
     """Окно управления резервными копиями"""
     
+    # iid строки-заглушки пустого списка
+    _EMPTY_ROW_IID = "__no_backups__"
+    # Подписи типов бэкапа (BackupManager.list_backups()['type'])
+    _BACKUP_TYPE_LABELS = {'auto': "Auto", 'scheduled': "Scheduled", 'manual': "Manual"}
+    # Строки дерева добавляются порциями по мере прокрутки
+    TREE_BATCH_SIZE = 50
+    
     def __init__(self, parent, backup_manager):
         self.parent = parent
         self.backup_manager = backup_manager
+        # Кнопки, которые блокируются на время фоновой операции
+        self._action_buttons = []
+        self._busy = False
+        # Строки дерева, еще не вставленные в Treeview: [(iid, (values, tags)), ...]
+        self._pending_rows = []
+        self._load_more_scheduled = False
         
         self.window = tk.Toplevel(parent)
         self.window.title("Database Backup Manager")
@@ -32,6 +69,12 @@ class BackupManagerWindow:
         self.window.transient(parent)
         self.window.grab_set()
         self.window.focus_set()
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+    
+    def close(self):
+        """Закрывает окно (не во время фоновой операции)"""
+        if not self._busy:
+            self.window.destroy()
     
     def center_window(self):
         """Центрирует окно"""
@@ -51,42 +94,13 @@ class BackupManagerWindow:
     
     def setup_ui(self):
         """Настройка интерфейса"""
-        # Main container with scrollbar
+        # Main container: прокрутка внешнего холста не нужна - список бэкапов
+        # прокручивается в собственном Treeview
         main_container = ttk.Frame(self.window)
         main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Canvas for scrollable content
-        canvas = tk.Canvas(main_container)
-        scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
-        
-        # Scrollable frame
-        self.main_frame = ttk.Frame(canvas)
-        
-        # Configure scroll
-        def configure_scroll(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            
-        self.main_frame.bind("<Configure>", configure_scroll)
-        
-        # Create window in canvas
-        canvas.create_window((0, 0), window=self.main_frame, anchor="nw", width=canvas.winfo_width())
-        
-        # Configure canvas
-        def configure_canvas(event):
-            canvas.itemconfig(1, width=event.width)
-            
-        canvas.bind('<Configure>', configure_canvas)
-        
-        # Pack canvas and scrollbar
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Mouse wheel scrolling
-        def on_mouse_wheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-            
-        canvas.bind_all("<MouseWheel>", on_mouse_wheel)
+        self.main_frame = ttk.Frame(main_container)
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
         
         # Header
         header_frame = ttk.Frame(self.main_frame)
@@ -102,12 +116,14 @@ class BackupManagerWindow:
         control_frame = ttk.Frame(self.main_frame)
         control_frame.pack(fill=tk.X, pady=(0, 15), padx=10)
         
-        ttk.Button(
+        button = ttk.Button(
             control_frame,
             text="🔄 Create New Backup",
             command=self.create_backup,
             width=22
-        ).pack(side=tk.LEFT, padx=(0, 10))
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.LEFT, padx=(0, 10))
         
         ttk.Button(
             control_frame,
@@ -116,25 +132,63 @@ class BackupManagerWindow:
             width=22
         ).pack(side=tk.LEFT, padx=(0, 10))
         
-        ttk.Button(
+        button = ttk.Button(
             control_frame,
             text="🔄 Refresh List",
             command=self.load_backups,
             width=22
-        ).pack(side=tk.LEFT)
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.LEFT)
         
-        ttk.Button(
+        button = ttk.Button(
             control_frame,
             text="🧹 Clean Temp Files",
             command=self.cleanup_temp_files,
             width=18
-        ).pack(side=tk.LEFT, padx=(0, 10))
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.LEFT, padx=(0, 10))
         
         # Stats frame
         self.stats_frame = ttk.LabelFrame(self.main_frame, text="Backup Statistics", padding="15")
         self.stats_frame.pack(fill=tk.X, pady=(0, 15), padx=10)
         
-        # Stats content will be added in load_backups()
+        # Метки статистики создаются один раз, load_backups() меняет только текст
+        self.total_backups_var = tk.StringVar()
+        self.total_size_var = tk.StringVar()
+        self.oldest_backup_var = tk.StringVar()
+        self.newest_backup_var = tk.StringVar()
+        self.backup_location_var = tk.StringVar()
+        
+        stats_grid = ttk.Frame(self.stats_frame)
+        stats_grid.pack(fill=tk.X)
+        
+        # Колонка 1
+        col1 = ttk.Frame(stats_grid)
+        col1.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        
+        ttk.Label(col1, textvariable=self.total_backups_var,
+                 font=("Arial", 10)).pack(anchor=tk.W, pady=2)
+        ttk.Label(col1, textvariable=self.total_size_var,
+                 font=("Arial", 10)).pack(anchor=tk.W, pady=2)
+        
+        # Колонка 2
+        col2 = ttk.Frame(stats_grid)
+        col2.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        ttk.Label(col2, textvariable=self.oldest_backup_var,
+                 font=("Arial", 10)).pack(anchor=tk.W, pady=2)
+        ttk.Label(col2, textvariable=self.newest_backup_var,
+                 font=("Arial", 10)).pack(anchor=tk.W, pady=2)
+        
+        # Путь к папке
+        ttk.Label(
+            self.stats_frame,
+            textvariable=self.backup_location_var,
+            font=("Arial", 9),
+            foreground="blue"
+        ).pack(anchor=tk.W, pady=(10, 0))
         
         # Backups list frame
         list_frame = ttk.LabelFrame(self.main_frame, text="Available Backups", padding="10")
@@ -165,7 +219,8 @@ class BackupManagerWindow:
         
         # Scrollbar for treeview
         tree_scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.backup_tree.yview)
-        self.backup_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self._tree_scrollbar = tree_scrollbar
+        self.backup_tree.configure(yscrollcommand=self._on_tree_scroll)
         
         # Pack treeview and scrollbar
         self.backup_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -173,33 +228,41 @@ class BackupManagerWindow:
         
         # Action buttons frame (ВИДИМАЯ, внизу основного фрейма)
         action_frame = ttk.Frame(self.main_frame)
-        action_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+        # Кнопки и строка статуса упаковываются раньше списка: при уменьшении
+        # окна сжимается список, а не они
+        action_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 10), padx=10, before=list_frame)
         
         # Left side buttons
         left_btn_frame = ttk.Frame(action_frame)
         left_btn_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        ttk.Button(
+        button = ttk.Button(
             left_btn_frame,
             text="📥 Restore Selected",
             command=self.restore_selected,
             width=18
-        ).pack(side=tk.LEFT, padx=(0, 10))
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.LEFT, padx=(0, 10))
         
-        ttk.Button(
+        button = ttk.Button(
             left_btn_frame,
             text="🗑️ Delete Selected",
             command=self.delete_selected,
             width=18
-        ).pack(side=tk.LEFT)
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.LEFT)
         
         # Right side button (Close)
-        ttk.Button(
+        button = ttk.Button(
             action_frame,
             text="✕ Close",
-            command=self.window.destroy,
+            command=self.close,
             width=15
-        ).pack(side=tk.RIGHT)
+        )
+        self._action_buttons.append(button)
+        button.pack(side=tk.RIGHT)
         
         # Status bar at the bottom
         self.status_var = tk.StringVar(value="Ready")
@@ -210,97 +273,62 @@ class BackupManagerWindow:
             anchor=tk.W,
             padding=(5, 2)
         )
-        status_bar.pack(fill=tk.X, padx=10, pady=(0, 5))
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5), before=action_frame)
+        
+        # Настройка цветов для разных типов
+        self.backup_tree.tag_configure('auto', foreground='green')
+        self.backup_tree.tag_configure('manual', foreground='blue')
+        self.backup_tree.tag_configure('scheduled', foreground='orange')
         
         # Double-click to restore
         self.backup_tree.bind("<Double-1>", lambda e: self.restore_selected())
-        
-        # Update scroll region after window is shown
-        self.window.after(100, lambda: configure_scroll(None))
     
     def load_backups(self):
         """Загружает бэкапы и статистику"""
         try:
-            # Очищаем статистику
-            for widget in self.stats_frame.winfo_children():
-                widget.destroy()
-            
             # Получаем статистику
             stats = self.backup_manager.get_backup_stats()
             
-            # Отображаем статистику в несколько колонок
-            stats_grid = ttk.Frame(self.stats_frame)
-            stats_grid.pack(fill=tk.X)
-            
-            # Колонка 1
-            col1 = ttk.Frame(stats_grid)
-            col1.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-            
-            ttk.Label(col1, 
-                     text=f"📊 Total Backups: {stats['total_backups']}",
-                     font=("Arial", 10)).pack(anchor=tk.W, pady=2)
-            
-            ttk.Label(col1, 
-                     text=f"💾 Total Size: {stats['total_size_mb']:.1f} MB",
-                     font=("Arial", 10)).pack(anchor=tk.W, pady=2)
-            
-            # Колонка 2
-            col2 = ttk.Frame(stats_grid)
-            col2.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            if stats['oldest_backup']:
-                ttk.Label(col2, 
-                         text=f"📅 Oldest: {stats['oldest_backup'].strftime('%Y-%m-%d')}",
-                         font=("Arial", 10)).pack(anchor=tk.W, pady=2)
-            
-            if stats['newest_backup']:
-                ttk.Label(col2, 
-                         text=f"🕒 Latest: {stats['newest_backup'].strftime('%Y-%m-%d %H:%M')}",
-                         font=("Arial", 10)).pack(anchor=tk.W, pady=2)
-            
-            # Путь к папке
-            path_label = ttk.Label(
-                self.stats_frame,
-                text=f"📁 Location: {stats['backup_dir']}",
-                font=("Arial", 9),
-                foreground="blue"
+            self.total_backups_var.set(f"📊 Total Backups: {stats['total_backups']}")
+            self.total_size_var.set(f"💾 Total Size: {stats['total_size_mb']:.1f} MB")
+            self.oldest_backup_var.set(
+                f"📅 Oldest: {stats['oldest_backup'].strftime('%Y-%m-%d')}"
+                if stats['oldest_backup'] else ""
             )
-            path_label.pack(anchor=tk.W, pady=(10, 0))
-            
-            # Очищаем дерево
-            for item in self.backup_tree.get_children():
-                self.backup_tree.delete(item)
+            self.newest_backup_var.set(
+                f"🕒 Latest: {stats['newest_backup'].strftime('%Y-%m-%d %H:%M')}"
+                if stats['newest_backup'] else ""
+            )
+            self.backup_location_var.set(f"📁 Location: {stats['backup_dir']}")
             
             # Загружаем бэкапы
             backups = self.backup_manager.list_backups()
             
-            if not backups:
+            # Строки дерева: iid = имя файла
+            rows = {}
+            type_labels = self._BACKUP_TYPE_LABELS
+            for backup in backups:
+                # Тип бэкапа определен в list_backups(); тег строки = тип
+                backup_type = backup['type']
+                rows[backup['name']] = (
+                    (
+                        backup['name'],
+                        f"{backup['size_mb']:.1f}",
+                        backup['created_display'],
+                        type_labels[backup_type]
+                    ),
+                    (backup_type,)
+                )
+            if not rows:
                 # Пустой список
-                self.backup_tree.insert("", "end", values=("No backups found", "", "", ""))
-            else:
-                for backup in backups:
-                    # Определяем тип бэкапа
-                    backup_type = "Manual"
-                    if "auto" in backup['name']:
-                        backup_type = "Auto"
-                    elif "scheduled" in backup['name']:
-                        backup_type = "Scheduled"
-                    
-                    self.backup_tree.insert(
-                        "", "end",
-                        values=(
-                            backup['name'],
-                            f"{backup['size_mb']:.1f}",
-                            backup['created'].strftime("%Y-%m-%d %H:%M"),
-                            backup_type
-                        ),
-                        tags=(backup_type.lower(),)
-                    )
+                rows[self._EMPTY_ROW_IID] = (("No backups found", "", "", ""), ())
             
-            # Настройка цветов для разных типов
-            self.backup_tree.tag_configure('auto', foreground='green')
-            self.backup_tree.tag_configure('manual', foreground='blue')
-            self.backup_tree.tag_configure('scheduled', foreground='orange')
+            # В дерево - первая порция (или столько, сколько уже было прокручено),
+            # остальные строки добавит _load_more_rows при прокрутке
+            loaded = max(len(self.backup_tree.get_children()), self.TREE_BATCH_SIZE)
+            items = list(rows.items())
+            self._pending_rows = items[loaded:]
+            self._update_tree(dict(items[:loaded]))
             
             # Обновляем статус
             self.status_var.set(f"Loaded {len(backups)} backup(s)")
@@ -309,61 +337,152 @@ class BackupManagerWindow:
             logger.error(f"Error loading backups: {e}")
             self.status_var.set(f"Error: {str(e)}")
     
+    def _on_tree_scroll(self, first, last):
+        """yscrollcommand дерева: у конца списка подгружает следующую порцию строк"""
+        self._tree_scrollbar.set(first, last)
+        if self._pending_rows and not self._load_more_scheduled and float(last) > 0.8:
+            self._load_more_scheduled = True
+            self.backup_tree.after_idle(self._load_more_rows)
+    
+    def _load_more_rows(self):
+        """Вставляет в дерево следующую порцию строк"""
+        self._load_more_scheduled = False
+        if not self.backup_tree.winfo_exists():
+            return
+        batch = self._pending_rows[:self.TREE_BATCH_SIZE]
+        del self._pending_rows[:self.TREE_BATCH_SIZE]
+        for iid, (values, tags) in batch:
+            if not self.backup_tree.exists(iid):
+                self.backup_tree.insert("", "end", iid=iid, values=values, tags=tags)
+    
+    def _update_tree(self, rows):
+        """Обновляет дерево бэкапов по разнице с текущими строками
+        
+        rows: {iid: (values, tags)} в нужном порядке. Удаляются, добавляются
+        и изменяются только отличающиеся строки.
+        """
+        tree = self.backup_tree
+        existing = set(tree.get_children())
+        
+        stale = existing - rows.keys()
+        if stale:
+            tree.delete(*stale)
+        
+        for iid, (values, tags) in rows.items():
+            if iid not in existing:
+                tree.insert("", "end", iid=iid, values=values, tags=tags)
+            else:
+                item = tree.item(iid)
+                # Treeview возвращает значения приведенными (числа - как int/float)
+                if tuple(map(str, item['values'])) != values or tuple(item['tags'] or ()) != tags:
+                    tree.item(iid, values=values, tags=tags)
+        
+        # Порядок (новые первыми) - перемещаем строки только если он нарушен
+        order = list(rows)
+        if list(tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                tree.move(iid, "", index)
+    
+    def _set_busy(self, busy: bool):
+        """Блокирует кнопки действий на время фоновой операции"""
+        self._busy = busy
+        state = ["disabled"] if busy else ["!disabled"]
+        for button in self._action_buttons:
+            button.state(state)
+    
+    def _run_in_background(self, message, work, on_done):
+        """
+        Выполняет work() в пуле _EXECUTOR, on_done(result, error) - в потоке Tk
+        
+        Tk не потокобезопасен: пул только выполняет work(), а виджеты
+        обновляются в потоке Tk после завершения future (опрос через after()).
+        """
+        self.status_var.set(message)
+        self._set_busy(True)
+        progress = ProgressDialog(self.window, "Please wait", message)
+        # Диалог закрывается только по завершении работы
+        progress.window.protocol("WM_DELETE_WINDOW", lambda: None)
+        
+        def on_finished(result, error):
+            progress.close()
+            self._set_busy(False)
+            # Диалог прогресса забрал grab - возвращаем его окну менеджера
+            self.window.grab_set()
+            on_done(result, error)
+        
+        self._await(_EXECUTOR.submit(work), on_finished)
+    
+    def _await(self, future, on_done):
+        """Ждет future без блокировки цикла Tk и вызывает on_done(result, error)"""
+        if not future.done():
+            self.window.after(50, self._await, future, on_done)
+            return
+        error = future.exception()
+        on_done(None if error is not None else future.result(), error)
+    
     def create_backup(self):
         """Создает новый бэкап"""
-        if messagebox.askyesno("Create Backup", 
-                              "Create new database backup?\n\n"
-                              "This may take a few moments..."):
-            self.status_var.set("Creating backup...")
-            self.window.update()
-            
-            try:
-                result = self.backup_manager.create_backup(backup_type="manual", max_backups=20)
-                
-                if result:
-                    messagebox.showinfo(
-                        "Backup Created",
-                        f"✓ Database backup created successfully!\n\n"
-                        f"File: {result['name']}\n"
-                        f"Size: {result['size_mb']:.2f} MB\n"
-                        f"Time: {result['timestamp']}"
-                    )
-                    self.load_backups()
-                    self.status_var.set("Backup created successfully")
-                else:
-                    messagebox.showerror("Backup Error", "Failed to create backup")
-                    self.status_var.set("Backup creation failed")
-                    
-            except Exception as e:
-                logger.error(f"Error creating backup: {e}")
-                messagebox.showerror("Backup Error", f"Error: {str(e)}")
-                self.status_var.set("Backup error occurred")
+        if self._busy:
+            return
+        if ask_yesno(self.window, "Create Backup", 
+                     "Create new database backup?\n\n"
+                     "This may take a few moments..."):
+            self._run_in_background(
+                "Creating backup...",
+                lambda: self.backup_manager.create_backup(backup_type="manual", max_backups=20),
+                self._on_backup_created
+            )
+    
+    def _on_backup_created(self, result, error):
+        """Результат create_backup (в потоке Tk)"""
+        if error is not None:
+            logger.error(f"Error creating backup: {error}")
+            show_error(self.window, "Backup Error", f"Error: {str(error)}")
+            self.status_var.set("Backup error occurred")
+        elif result:
+            show_info(
+                self.window,
+                "Backup Created",
+                f"✓ Database backup created successfully!\n\n"
+                f"File: {result['name']}\n"
+                f"Size: {result['size_mb']:.2f} MB\n"
+                f"Time: {result['timestamp']}"
+            )
+            self.load_backups()
+            self.status_var.set("Backup created successfully")
+        else:
+            show_error(self.window, "Backup Error", "Failed to create backup")
+            self.status_var.set("Backup creation failed")
     
     def open_backup_folder(self):
         """Открывает папку с бэкапами"""
-        try:
-            backup_dir = self.backup_manager.backup_dir
-            
-            if os.name == 'nt':  # Windows
-                os.startfile(backup_dir)
-            elif os.name == 'posix':  # Linux/Mac
-                subprocess.Popen(['xdg-open', str(backup_dir)])
-            else:
-                messagebox.showinfo("Backup Folder", 
-                                  f"Backup folder location:\n{backup_dir}")
-                
-            self.status_var.set("Opened backup folder")
-                
-        except Exception as e:
-            logger.error(f"Error opening backup folder: {e}")
-            messagebox.showerror("Error", f"Cannot open folder:\n{str(e)}")
+        backup_dir = self.backup_manager.backup_dir
+        
+        if os.name not in ('nt', 'posix'):
+            show_info(self.window, "Backup Folder", 
+                      f"Backup folder location:\n{backup_dir}")
+            return
+        
+        # Запуск файлового менеджера - в пуле, чтобы не ждать его в потоке Tk
+        self.status_var.set("Opening backup folder...")
+        self._await(_EXECUTOR.submit(_open_folder, str(backup_dir)), self._on_folder_opened)
+    
+    def _on_folder_opened(self, _, error):
+        """Результат open_backup_folder (в потоке Tk)"""
+        if error is not None:
+            logger.error(f"Error opening backup folder: {error}")
+            show_error(self.window, "Error", f"Cannot open folder:\n{str(error)}")
             self.status_var.set("Failed to open folder")
+        else:
+            self.status_var.set("Opened backup folder")
     
     def restore_selected(self):
         """Восстанавливает выбранный бэкап"""
+        if self._busy:
+            return
         selected = self.backup_tree.selection()
         if not selected:
-            messagebox.showwarning("No Selection", "Please select a backup to restore")
+            show_warning(self.window, "No Selection", "Please select a backup to restore")
             return
         
         item = self.backup_tree.item(selected[0])
@@ -372,7 +491,8 @@ class BackupManagerWindow:
         if backup_name == "No backups found":
             return
         
-        if messagebox.askyesno(
+        if ask_yesno(
+            self.window,
             "Confirm Restore",
             f"⚠️ RESTORE DATABASE FROM BACKUP\n\n"
             f"File: {backup_name}\n\n"
@@ -381,32 +501,38 @@ class BackupManagerWindow:
             f"Are you sure you want to continue?",
             icon='warning'
         ):
-            self.status_var.set("Restoring backup...")
-            self.window.update()
-            
-            try:
-                if self.backup_manager.restore_backup(backup_name):
-                    messagebox.showinfo(
-                        "Restore Complete",
-                        "✓ Database restored successfully!\n\n"
-                        "Please RESTART the application to use the restored data."
-                    )
-                    self.status_var.set("Database restored - restart required")
-                    # Не закрываем окно, чтобы пользователь видел сообщение
-                else:
-                    messagebox.showerror("Restore Error", "Failed to restore backup")
-                    self.status_var.set("Restore failed")
-                    
-            except Exception as e:
-                logger.error(f"Error restoring backup: {e}")
-                messagebox.showerror("Restore Error", f"Error: {str(e)}")
-                self.status_var.set("Restore error occurred")
+            self._run_in_background(
+                "Restoring backup...",
+                lambda: self.backup_manager.restore_backup(backup_name),
+                self._on_backup_restored
+            )
+    
+    def _on_backup_restored(self, restored, error):
+        """Результат restore_backup (в потоке Tk)"""
+        if error is not None:
+            logger.error(f"Error restoring backup: {error}")
+            show_error(self.window, "Restore Error", f"Error: {str(error)}")
+            self.status_var.set("Restore error occurred")
+        elif restored:
+            show_info(
+                self.window,
+                "Restore Complete",
+                "✓ Database restored successfully!\n\n"
+                "Please RESTART the application to use the restored data."
+            )
+            self.status_var.set("Database restored - restart required")
+            # Не закрываем окно, чтобы пользователь видел сообщение
+        else:
+            show_error(self.window, "Restore Error", "Failed to restore backup")
+            self.status_var.set("Restore failed")
     
     def delete_selected(self):
         """Удаляет выбранный бэкап"""
+        if self._busy:
+            return
         selected = self.backup_tree.selection()
         if not selected:
-            messagebox.showwarning("No Selection", "Please select a backup to delete")
+            show_warning(self.window, "No Selection", "Please select a backup to delete")
             return
         
         item = self.backup_tree.item(selected[0])
@@ -415,36 +541,58 @@ class BackupManagerWindow:
         if backup_name == "No backups found":
             return
         
-        if messagebox.askyesno(
+        if ask_yesno(
+            self.window,
             "Confirm Delete",
             f"Delete backup file?\n\n"
             f"File: {backup_name}\n\n"
             f"This action cannot be undone.",
             icon='warning'
         ):
-            try:
-                backup_path = self.backup_manager.backup_dir / backup_name
-                os.remove(backup_path)
-                
-                messagebox.showinfo("Deleted", "Backup file deleted successfully")
-                self.load_backups()
-                self.status_var.set("Backup deleted")
-                
-            except Exception as e:
-                logger.error(f"Error deleting backup: {e}")
-                messagebox.showerror("Delete Error", f"Failed to delete:\n{str(e)}")
-                self.status_var.set("Delete failed")
+            backup_path = self.backup_manager.backup_dir / backup_name
+            self._run_in_background(
+                "Deleting backup...",
+                lambda: os.remove(backup_path),
+                self._on_backup_deleted
+            )
+    
+    def _on_backup_deleted(self, _, error):
+        """Результат удаления бэкапа (в потоке Tk)"""
+        if error is not None:
+            logger.error(f"Error deleting backup: {error}")
+            show_error(self.window, "Delete Error", f"Failed to delete:\n{str(error)}")
+            self.status_var.set("Delete failed")
+        else:
+            show_info(self.window, "Deleted", "Backup file deleted successfully")
+            self.load_backups()
+            self.status_var.set("Backup deleted")
                 
     def cleanup_temp_files(self):
         """Очищает временные файлы восстановления"""
-        if messagebox.askyesno(
+        if self._busy:
+            return
+        if ask_yesno(
+            self.window,
             "Clean Temporary Files",
             "Delete temporary restore files older than 2 hours?\n\n"
             "These files are created automatically before restore operations."
         ):
-            deleted = self.backup_manager.cleanup_temp_files(max_age_hours=2)
-            messagebox.showinfo(
-                "Cleanup Complete",
-                f"Deleted {deleted} temporary file(s)"
+            self._run_in_background(
+                "Cleaning temporary files...",
+                lambda: self.backup_manager.cleanup_temp_files(max_age_hours=2),
+                self._on_temp_files_cleaned
             )
-            self.status_var.set(f"Cleaned up {deleted} temp file(s)")
\ No newline at end of file
+    
+    def _on_temp_files_cleaned(self, deleted, error):
+        """Результат cleanup_temp_files (в потоке Tk)"""
+        if error is not None:
+            logger.error(f"Error cleaning temp files: {error}")
+            show_error(self.window, "Cleanup Error", f"Error: {str(error)}")
+            self.status_var.set("Cleanup failed")
+            return
+        show_info(
+            self.window,
+            "Cleanup Complete",
+            f"Deleted {deleted} temporary file(s)"
+        )
+        self.status_var.set(f"Cleaned up {deleted} temp file(s)")
\ No newline at end of file
@@ -4,9 +4,28 @@
 """
 
 import tkinter as tk
+from functools import lru_cache
 from PIL import Image, ImageTk
 import os
 
+# Для миниатюр BILINEAR визуально не отличается от LANCZOS и в разы быстрее
+RESAMPLE = getattr(Image, 'Resampling', Image).BILINEAR
+
+
+@lru_cache(maxsize=64)
+def _load_thumbnail(path, mtime, width, height):
+    """Открывает и уменьшает изображение; mtime в ключе сбрасывает кэш при изменении файла
+
+    Кэшируется PIL Image, а не PhotoImage: PhotoImage привязан к интерпретатору Tk.
+    """
+    with Image.open(path) as img:
+        if img.format == 'JPEG':
+            # libjpeg декодирует сразу в уменьшенном масштабе (DCT scaling)
+            img.draft('RGB', (width * 2, height * 2))
+        img.thumbnail((width, height), RESAMPLE)
+        return img.copy()
+
+
 class ImagePreview(tk.Frame):
     def __init__(self, parent, width=400, height=200, bg="white"):
         super().__init__(parent, width=width, height=height, bg=bg)
@@ -16,31 +35,35 @@ class ImagePreview(tk.Frame):
         self.image_label = tk.Label(self, bg=bg)
         self.image_label.pack(fill=tk.BOTH, expand=True)
         self.current_image = None
+        self._current_key = None  # (path, mtime) показанного файла
 
-    def set_image(self, path):
-        """Показывает изображение (масштабирует по размеру виджета)"""
-        if not os.path.exists(path):
+    def _show_file(self, path):
+        """Показывает файл через кэш миниатюр; тот же неизмененный файл не перерисовывается"""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
             self.clear()
             return
+        key = (path, mtime)
+        if key == self._current_key and self.current_image is not None:
+            return
+        img = _load_thumbnail(path, mtime, self.width, self.height)
+        self.current_image = ImageTk.PhotoImage(img)
+        self.image_label.config(image=self.current_image)
+        self._current_key = key
+
+    def set_image(self, path):
+        """Показывает изображение (масштабирует по размеру виджета)"""
         try:
-            img = Image.open(path)
-            img.thumbnail((self.width, self.height), Image.ANTIALIAS)
-            self.current_image = ImageTk.PhotoImage(img)
-            self.image_label.config(image=self.current_image)
+            self._show_file(path)
         except Exception as e:
             self.clear()
             print(f"Failed to load image {path}: {e}")
 
     def set_pdf_icon(self, icon_path):
         """Показывает иконку PDF вместо изображения"""
-        if not os.path.exists(icon_path):
-            self.clear()
-            return
         try:
-            img = Image.open(icon_path)
-            img.thumbnail((self.width, self.height), Image.ANTIALIAS)
-            self.current_image = ImageTk.PhotoImage(img)
-            self.image_label.config(image=self.current_image)
+            self._show_file(icon_path)
         except Exception as e:
             self.clear()
             print(f"Failed to load PDF icon {icon_path}: {e}")
@@ -48,4 +71,5 @@ class ImagePreview(tk.Frame):
     def clear(self):
         """Очищает предпросмотр"""
         self.current_image = None
+        self._current_key = None
         self.image_label.config(image="", text="", bg=self.bg)
@@ -100,9 +100,11 @@ def show_info(parent, title: str, message: str):
     """Показывает информационный диалог"""
     messagebox.showinfo(title, message, parent=parent)
 
-def ask_yesno(parent, title: str, message: str) -> bool:
+def ask_yesno(parent, title: str, message: str, icon: Optional[str] = None) -> bool:
     """Спрашивает Да/Нет"""
-    return messagebox.askyesno(title, message, parent=parent)
+    # Без icon messagebox сам ставит значок вопроса; icon=None его бы сбросил
+    options = {'icon': icon} if icon else {}
+    return messagebox.askyesno(title, message, parent=parent, **options)
 
 def ask_yesnocancel(parent, title: str, message: str) -> Optional[bool]:
     """Спрашивает Да/Нет/Отмена"""
@@ -1,6 +1,58 @@
 import tkinter as tk
 from tkinter import ttk
 
+# События колесика: Windows/macOS - <MouseWheel>, X11 - <Button-4>/<Button-5>
+_WHEEL_EVENTS = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+
+
+def _wheel_delta(event) -> int:
+    """Шаг прокрутки в строках для события колесика"""
+    if event.num == 4:
+        return -1
+    if event.num == 5:
+        return 1
+    return int(-1 * (event.delta / 120))
+
+
+def bind_mousewheel(area: tk.Misc, canvas: tk.Canvas, horizontal: bool = False):
+    """
+    Прокрутка canvas колесиком, пока указатель находится над area.
+    
+    Глобальная привязка (bind_all) ставится только на время нахождения
+    указателя над областью и снимается при выходе из нее, поэтому
+    несколько прокручиваемых окон не перехватывают колесико друг у друга.
+    horizontal=True добавляет горизонтальную прокрутку по Shift+колесико.
+    """
+    def on_wheel(event):
+        if canvas.winfo_exists():
+            canvas.yview_scroll(_wheel_delta(event), "units")
+    
+    def on_shift_wheel(event):
+        if canvas.winfo_exists():
+            canvas.xview_scroll(_wheel_delta(event), "units")
+    
+    bindings = [(sequence, on_wheel) for sequence in _WHEEL_EVENTS]
+    if horizontal:
+        bindings.append(("<Shift-MouseWheel>", on_shift_wheel))
+    
+    def on_enter(event):
+        for sequence, handler in bindings:
+            area.bind_all(sequence, handler)
+    
+    def on_leave(event):
+        # <Leave> приходит и при переходе на дочерний виджет - проверяем,
+        # что указатель действительно вышел за пределы области
+        widget = area.winfo_containing(*area.winfo_pointerxy())
+        while widget is not None:
+            if widget is area:
+                return
+            widget = widget.master
+        for sequence, _ in bindings:
+            area.unbind_all(sequence)
+    
+    area.bind("<Enter>", on_enter, add="+")
+    area.bind("<Leave>", on_leave, add="+")
+
 class ScrollableContainer(ttk.Frame):
     """
     Универсальный контейнер с вертикальной прокруткой.
@@ -16,11 +68,11 @@ class ScrollableContainer(ttk.Frame):
         # Фрейм внутри холста, в котором будут все ваши виджеты
         self.scrollable_content = ttk.Frame(self.canvas)
 
+        # Отложенный пересчет разметки (см. _schedule_layout)
+        self._resize_after = None
+
         # При изменении размера содержимого обновляем область прокрутки
-        self.scrollable_content.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.scrollable_content.bind("<Configure>", self._schedule_layout)
 
         # Размещаем фрейм на холсте
         self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_content, anchor="nw")
@@ -33,14 +85,23 @@ class ScrollableContainer(ttk.Frame):
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
 
-        # Поддержка прокрутки колесиком мыши
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        # Поддержка прокрутки колесиком мыши (только над этим контейнером)
+        bind_mousewheel(self, self.canvas)
 
     def _on_canvas_configure(self, event):
-        # Гарантируем, что ширина контента совпадает с шириной видимой области
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        self._schedule_layout()
 
-    def _on_mousewheel(self, event):
-        # Прокрутка для Windows
-        if self.canvas.winfo_exists():
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
\ No newline at end of file
+    def _schedule_layout(self, event=None):
+        # При изменении размера окна <Configure> приходит сериями -
+        # пересчитываем разметку один раз, через 50 мс после последнего события
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(50, self._update_layout)
+
+    def _update_layout(self):
+        self._resize_after = None
+        if not self.canvas.winfo_exists():
+            return
+        # Гарантируем, что ширина контента совпадает с шириной видимой области
+        self.canvas.itemconfig(self.canvas_window, width=self.canvas.winfo_width())
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -1,11 +1,64 @@
 """
 Кастомные виджеты
 """
+import io
+import hashlib
 import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
 from typing import Optional, List, Callable
 from PIL import Image
-RESAMPLE = getattr(Image, 'Resampling', Image).LANCZOS if hasattr(Image, 'Resampling') else Image.ANTIALIAS
+# Для маленьких превью BILINEAR визуально не отличается от LANCZOS и в разы быстрее
+RESAMPLE = getattr(Image, 'Resampling', Image).BILINEAR
+
+
+# Кэш превью: (digest, width, height) -> PIL Image. Ключом служит короткий
+# digest, а не сами байты фото: кэш не держит копии BLOB и не хэширует их повторно
+_PREVIEW_CACHE_SIZE = 32
+_preview_cache: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+
+
+def _scaled_preview(image_data: bytes, width: int, height: int) -> Image.Image:
+    """Декодирует и масштабирует изображение под размер превью (с сохранением пропорций)
+    
+    Кэшируется PIL Image, а не PhotoImage: PhotoImage привязан к интерпретатору Tk.
+    Повторный выбор того же инструмента не декодирует фото заново.
+    """
+    key = (hashlib.blake2b(image_data, digest_size=16).digest(), width, height)
+    img = _preview_cache.get(key)
+    if img is not None:
+        _preview_cache.move_to_end(key)
+        return img
+    
+    img = _decode_preview(image_data, width, height)
+    _preview_cache[key] = img
+    if len(_preview_cache) > _PREVIEW_CACHE_SIZE:
+        _preview_cache.popitem(last=False)
+    return img
+
+
+def _decode_preview(image_data: bytes, width: int, height: int) -> Image.Image:
+    """Декодирует и масштабирует изображение (без кэша)"""
+    img = Image.open(io.BytesIO(image_data))
+    if img.format == 'JPEG':
+        # libjpeg декодирует сразу в уменьшенном масштабе (DCT scaling)
+        img.draft('RGB', (width * 2, height * 2))
+    
+    # Рассчитываем соотношение сторон
+    img_ratio = img.width / img.height
+    preview_ratio = width / height
+    
+    # Масштабируем с сохранением пропорций
+    if img_ratio > preview_ratio:
+        # Широкое изображение
+        new_width = width
+        new_height = int(width / img_ratio)
+    else:
+        # Высокое изображение
+        new_height = height
+        new_width = int(height * img_ratio)
+    
+    return img.resize((new_width, new_height), RESAMPLE)
 
 class LabeledEntry(ttk.Frame):
     """Поле ввода с меткой"""
@@ -84,36 +137,24 @@ class ImagePreview(tk.Label):
             anchor='center'  # Центрируем содержимое
         )
         self.pack_propagate(False)  # Предотвращаем изменение размера
+        self._image_data = None  # данные показанного изображения
     
     def set_image(self, image_data: Optional[bytes]):
         """Устанавливает изображение"""
         if image_data:
+            if image_data is self._image_data and getattr(self, 'image', None) is not None:
+                # То же изображение уже показано
+                return
             try:
-                from PIL import Image, ImageTk
-                import io
-                
-                img = Image.open(io.BytesIO(image_data))
-                
-                # Рассчитываем соотношение сторон
-                img_ratio = img.width / img.height
-                preview_ratio = self.width / self.height
-                
-                # Масштабируем с сохранением пропорций
-                if img_ratio > preview_ratio:
-                    # Широкое изображение
-                    new_width = self.width
-                    new_height = int(self.width / img_ratio)
-                else:
-                    # Высокое изображение
-                    new_height = self.height
-                    new_width = int(self.height * img_ratio)
+                from PIL import ImageTk
                 
-                img = img.resize((new_width, new_height), RESAMPLE)
+                img = _scaled_preview(image_data, self.width, self.height)
                 photo = ImageTk.PhotoImage(img)
                 
                 # Обновляем метку
                 self.config(image=photo, text="")
                 self.image = photo  # сохраняем ссылку
+                self._image_data = image_data
                 
             except ImportError:
                 self.config(text="PIL not installed")
@@ -126,4 +167,5 @@ class ImagePreview(tk.Label):
         """Очищает изображение"""
         self.config(image='', text="No Image")
         if hasattr(self, 'image'):
-            self.image = None
\ No newline at end of file
+            self.image = None
+        self._image_data = None
\ No newline at end of file
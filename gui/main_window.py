@@ -15,6 +15,7 @@ from core.models import Profile, Tool
 from services.profile_service import ProfileService
 from services.tool_service import ToolService
 from gui.base.dialogs import show_error, show_warning, show_info, ask_yesno
+from gui.base.scroll_container import bind_mousewheel
 from gui.profile_editor import ProfileEditor
 from gui.tool_manager import ToolManager
 from gui.tool_assigner import ToolAssigner
@@ -82,7 +83,10 @@ class WeinigHydromatManager:
         
         # Инициализация менеджера бэкапов
         from utils.backup_manager import BackupManager
-        self.backup_manager = BackupManager('tools_database.db')
+        self.backup_manager = BackupManager(
+            'tools_database.db',
+            before_restore=self.db_manager.close  # файл базы не должен быть открыт
+        )
         
         # Горячие клавиши для бэкапа
         self.root.bind('<Control-B>', lambda e: self.create_backup())
@@ -100,7 +104,7 @@ class WeinigHydromatManager:
             
             # Проверяем, когда был последний авто-бэкап
             backups = self.backup_manager.list_backups()
-            auto_backups = [b for b in backups if 'auto' in b['name']]
+            auto_backups = [b for b in backups if b['type'] == 'auto']
             
             # Если сегодня еще не было авто-бэкапа
             today = datetime.now().date()
@@ -361,16 +365,8 @@ class WeinigHydromatManager:
         main_frame.rowconfigure(0, weight=1)
     
     def _bind_mouse_wheel(self):
-        """Привязывает прокрутку колесиком мыши"""
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        def _on_shift_mousewheel(event):
-            self.canvas.xview_scroll(int(-1*(event.delta/120)), "units")
-        
-        # Для Windows
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        self.canvas.bind_all("<Shift-MouseWheel>", _on_shift_mousewheel)
+        """Привязывает прокрутку колесиком мыши (пока указатель над главным окном)"""
+        bind_mousewheel(self.root, self.canvas, horizontal=True)
 
     def _on_window_configure(self, event):
         """Обновляет размеры при изменении окна"""
@@ -1307,9 +1303,15 @@ class WeinigHydromatManager:
             return
 
         assignment = assignments[head_number]
-        tool = self.tool_service.get_tool(assignment.tool_id)
+        tool = self.tool_service.get_tool(assignment.tool_id, with_photo=False)
+
+        if not tool or not tool.has_photo:
+            show_info(self.root, "Info", "No image available for this tool")
+            return
 
-        if not tool or not tool.photo:
+        # Фото набора загружаем только для просмотра
+        tool.photo = self.tool_service.get_tool_photo(tool.id)
+        if not tool.photo:
             show_info(self.root, "Info", "No image available for this tool")
             return
 
@@ -1318,16 +1320,16 @@ class WeinigHydromatManager:
 
     def load_profiles(self):
         """Загружает список профилей"""
-        profiles = self.profile_service.get_all_profiles()
+        profiles = self.profile_service.get_profile_list()
         
         # Очищаем Treeview
         for item in self.profiles_tree.get_children():
             self.profiles_tree.delete(item)
         
         # Добавляем профили в Treeview с форматированным ID
-        for profile in profiles:
-            formatted_id = f"{profile.id:03d}"  # Форматируем ID с ведущими нулями (001, 002, и т.д.)
-            self.profiles_tree.insert('', 'end', values=(formatted_id, profile.name))
+        for profile_id, name in profiles:
+            formatted_id = f"{profile_id:03d}"  # Форматируем ID с ведущими нулями (001, 002, и т.д.)
+            self.profiles_tree.insert('', 'end', values=(formatted_id, name))
         
         # Применяем текущую сортировку
         if hasattr(self, '_sort_column'):
@@ -1345,17 +1347,17 @@ class WeinigHydromatManager:
     def _on_search(self, event=None):
         """Обработка поиска"""
         search_term = self.search_var.get().strip().lower()
-        profiles = self.profile_service.get_all_profiles()
+        profiles = self.profile_service.get_profile_list()
         
         # Очищаем Treeview
         for item in self.profiles_tree.get_children():
             self.profiles_tree.delete(item)
         
         # Фильтруем и добавляем профили с форматированным ID
-        for profile in profiles:
-            if not search_term or search_term in profile.name.lower():
-                formatted_id = f"{profile.id:03d}"  # Форматируем ID с ведущими нулями
-                self.profiles_tree.insert('', 'end', values=(formatted_id, profile.name))
+        for profile_id, name in profiles:
+            if not search_term or search_term in name.lower():
+                formatted_id = f"{profile_id:03d}"  # Форматируем ID с ведущими нулями
+                self.profiles_tree.insert('', 'end', values=(formatted_id, name))
         
         # Если есть текущий профиль, выделяем его
         if hasattr(self, 'current_profile_id') and self.current_profile_id:
@@ -1386,11 +1388,11 @@ class WeinigHydromatManager:
 
             if head_num in assignments:
                 assignment = assignments[head_num]
-                tool = self.tool_service.get_tool(assignment.tool_id)
+                tool = self.tool_service.get_tool(assignment.tool_id, with_photo=False)
 
                 if tool:
                     # Use image icon if tool has a photo, otherwise use wrench emoji
-                    image_icon = "🖼️" if tool.photo else "🔧"
+                    image_icon = "🖼️" if tool.has_photo else "🔧"
                     tool_type = tool.tool_type or "[Unknown]"
                     tool_code = tool.code or "-"
                     rpm = assignment.rpm or "-"
@@ -1619,7 +1621,7 @@ class WeinigHydromatManager:
                 
                 if head_num in assignments:
                     assignment = assignments[head_num]
-                    tool = self.tool_service.get_tool(assignment.tool_id)
+                    tool = self.tool_service.get_tool(assignment.tool_id, with_photo=False)
                     
                     if tool:
                         tools.append(ToolLogEntry(
@@ -13,6 +13,7 @@ from services.profile_service import ProfileService
 from services.tool_service import ToolService
 from gui.base.dialogs import show_error, show_info, ask_yesno
 from gui.base.widgets import ImagePreview, LabeledEntry, LabeledSpinbox
+from gui.base.scroll_container import bind_mousewheel
 
 logger = logging.getLogger(__name__)
 
@@ -77,16 +78,8 @@ class ToolEditor:
         
         scrollable_frame.bind("<Configure>", _on_frame_configure)
         
-        # Привязываем колесо мыши для прокрутки
-        def _on_mouse_wheel(event):
-            try:
-                canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-            except tk.TclError:
-                # Игнорируем ошибки, возникающие при уничтожении окна
-                pass
-        
-        # Сохраняем ID привязки для последующего удаления
-        self._mouse_wheel_binding = canvas.bind_all("<MouseWheel>", _on_mouse_wheel)
+        # Привязываем колесо мыши для прокрутки (только над окном редактора)
+        bind_mousewheel(self.window, canvas)
         
         # Создаем окно с содержимым
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
@@ -125,13 +118,6 @@ class ToolEditor:
     
     def _on_close(self):
         """Обработчик закрытия окна"""
-        try:
-            # Удаляем привязку колеса мыши
-            if hasattr(self, '_mouse_wheel_binding'):
-                self.window.unbind_all("<MouseWheel>")
-        except Exception as e:
-            logger.warning(f"Ошибка при закрытии окна: {e}")
-        
         # Закрываем окно
         self.window.destroy()
     
@@ -181,9 +167,9 @@ class ToolEditor:
         ttk.Label(profile_frame, text="Select Profile:*").pack(anchor=tk.W, pady=(0, 5))
         
         # Загружаем профили
-        self.profiles = self.profile_service.get_all_profiles()
-        self.profile_names = [p.name for p in self.profiles]
-        self.profile_ids = [p.id for p in self.profiles]
+        self.profiles = self.profile_service.get_profile_list()
+        self.profile_names = [name for _, name in self.profiles]
+        self.profile_ids = [profile_id for profile_id, _ in self.profiles]
         self.profile_var = tk.StringVar()
         
         # Создаем комбобокс
@@ -375,10 +361,12 @@ class ToolEditor:
         image_btn_frame = ttk.Frame(image_frame)
         image_btn_frame.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Button(image_btn_frame, text="Browse Image", 
-                  command=self.browse_image).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(image_btn_frame, text="Remove Image", 
-                  command=self.remove_image).pack(side=tk.LEFT)
+        self.image_button = ttk.Button(image_btn_frame, text="Browse Image", 
+                                       command=self.browse_image)
+        self.image_button.pack(side=tk.LEFT, padx=(0, 10))
+        self.remove_image_button = ttk.Button(image_btn_frame, text="Remove Image", 
+                                              command=self.remove_image)
+        self.remove_image_button.pack(side=tk.LEFT)
         
         # Image preview with fixed size container
         preview_container = ttk.Frame(image_frame, height=150)  # Fixed height
@@ -483,6 +471,9 @@ class ToolEditor:
         if self.tool.photo:
             self.image_data = self.tool.photo
             self.image_preview.set_image(self.image_data)
+        
+        # Фото набора редактируется только у первого инструмента
+        self._update_image_editing_state()
     
     def _on_profile_selected(self, event):
         """Обработка выбора профиля"""
@@ -518,9 +509,9 @@ class ToolEditor:
     
     def _refresh_profiles(self):
         """Обновляет список профилей"""
-        self.profiles = self.profile_service.get_all_profiles()
-        self.profile_names = [p.name for p in self.profiles]
-        self.profile_ids = [p.id for p in self.profiles]
+        self.profiles = self.profile_service.get_profile_list()
+        self.profile_names = [name for _, name in self.profiles]
+        self.profile_ids = [profile_id for profile_id, _ in self.profiles]
         
         self.profile_combo['values'] = self.profile_names
         
@@ -554,10 +545,10 @@ class ToolEditor:
             decoded = self.tool_service.code_generator.decode(code)
             if decoded:
                 decoded_text = (
-                    f"Position: {decoded['position']} | "
-                    f"Type: {decoded['tool_type']} | "
-                    f"Profile ID: {decoded['profile_id']} | "
-                    f"Set: {decoded['set_number']}"
+                    f"Position: {decoded.position} | "
+                    f"Type: {decoded.tool_type} | "
+                    f"Profile ID: {decoded.profile_id} | "
+                    f"Set: {decoded.set_number}"
                 )
                 self.decoded_var.set(decoded_text)
             else:
@@ -636,10 +627,10 @@ class ToolEditor:
             decoded = self.tool_service.code_generator.decode(code)
             if decoded:
                 decoded_text = (
-                    f"Position: {decoded['position']} | "
-                    f"Type: {decoded['tool_type']} | "
-                    f"Profile ID: {decoded['profile_id']} | "
-                    f"Set: {decoded['set_number']}"
+                    f"Position: {decoded.position} | "
+                    f"Type: {decoded.tool_type} | "
+                    f"Profile ID: {decoded.profile_id} | "
+                    f"Set: {decoded.set_number}"
                 )
                 self.decoded_var.set(decoded_text)
             else:
@@ -745,34 +736,19 @@ class ToolEditor:
                 show_error(self.window, "Deletion Error", str(ve))
             except Exception as e:
                 show_error(self.window, "Error", f"Delete failed: {e}")
-            # In _update_image_editing_state
-            if not is_first_tool and tools_in_set_sorted:
-                self.image_button.tooltip = "Image can only be modified for the first tool in the set"
-                self.remove_image_button.tooltip = "Image can only be removed from the first tool in the set"
-            else:
-                self.image_button.tooltip = "Upload image"
-                self.remove_image_button.tooltip = "Remove image"
 
     def _update_image_editing_state(self):
         """Enable/disable image editing based on whether this is the first tool in the set"""
-        if not self.tool_id:  # New tool
+        if not self.tool:  # New tool
             return
             
-        # Get all tools in the same set
-        tools_in_set = self.tool_service.get_tools_by_code_prefix(
-            self.tool_data['Auto_Generated_Code'][:5]
-        )
-        
-        # Sort by ID to find the first tool
-        tools_in_set_sorted = sorted(tools_in_set, key=lambda x: x.id)
-        
         # Enable image editing only for the first tool in the set
-        is_first_tool = tools_in_set_sorted and tools_in_set_sorted[0].id == self.tool_id
+        is_first_tool = self.tool_service.is_first_tool_in_set(self.tool)
         self.image_button.config(state='normal' if is_first_tool else 'disabled')
         self.remove_image_button.config(state='normal' if is_first_tool else 'disabled')
         
         # Show a tooltip explaining why it's disabled
-        if not is_first_tool and tools_in_set_sorted:
+        if not is_first_tool:
             self.image_button.tooltip = "Изображение можно изменить только у первого инструмента в наборе"
             self.remove_image_button.tooltip = "Изображение можно удалить только у первого инструмента в наборе"
         else:
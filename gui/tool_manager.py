@@ -353,7 +353,7 @@ class ToolManager:
             tags = (tool.status,)
             
             # Добавляем иконку изображения если есть фото
-            image_icon = "🖼️" if tool.photo else ""
+            image_icon = "🖼️" if tool.has_photo else ""
             
             # Добавляем в таблицу и сохраняем ID элемента
             item_id = self.tools_tree.insert(
@@ -372,7 +372,7 @@ class ToolManager:
             )
             
             # Сохраняем данные изображения для быстрого доступа
-            if tool.photo:
+            if tool.has_photo:
                 self.tools_tree.set(item_id, "image", "🖼️")
                 self.tools_tree.item(item_id, tags=tags + ('has_image',))
             self.all_items.append(item_id)
@@ -546,7 +546,7 @@ class ToolManager:
             return
         
         # Находим и удаляем инструмент
-        tool = self.tool_service.get_tool_by_code(tool_code)
+        tool = self.tool_service.get_tool_by_code(tool_code, with_photo=False)
         if not tool:
             show_error(self.window, "Error", "Tool not found")
             return
@@ -693,7 +693,7 @@ class ToolManager:
         
         # Находим инструмент по коду
         tool_code = values[1]
-        tool = self.tool_service.get_tool_by_code(tool_code)
+        tool = self.tool_service.get_tool_by_code(tool_code, with_photo=False)
         
         if not tool:
             show_error(self.window, "Error", f"Tool with code '{tool_code}' not found")
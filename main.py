@@ -101,6 +101,9 @@ def check_dependencies():
     # Check for PIL/Pillow
     try:
         import PIL
+        # Сборки Pillow-SIMD имеют суффикс .postN в номере версии
+        simd_note = " (SIMD build)" if ".post" in PIL.__version__ else ""
+        logging.getLogger(__name__).info(f"Pillow version: {PIL.__version__}{simd_note}")
     except ImportError:
         missing_deps.append("Pillow (for image processing)")
     
@@ -210,6 +213,10 @@ def main():
         # Handle window closing
         def on_closing():
             logger.info("Application closing")
+            # Записываем отложенные изменения режима безопасности
+            from config.security import get_security_manager
+            get_security_manager().flush()
+            db_manager.close()
             root.destroy()
         
         root.protocol("WM_DELETE_WINDOW", on_closing)
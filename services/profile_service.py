@@ -47,8 +47,11 @@ class ProfileService(Observable):
     
     def get_all_profiles(self) -> List[Profile]:
         """Gets all profiles"""
-        rows = self.db.get_all_profiles()
-        return [Profile.from_db_row(row) for row in rows]
+        return Profile.from_db_rows(self.db.get_all_profiles())
+    
+    def get_profile_list(self) -> List[Tuple[int, str]]:
+        """Gets (id, name) of all profiles for list views"""
+        return self.db.get_profile_list()
     
     def get_profile(self, profile_id: int) -> Optional[Profile]:
         """Gets a profile by ID"""
@@ -81,21 +84,26 @@ class ProfileService(Observable):
     
     def count_tools(self, profile_id: int) -> int:
         """Counts tools in the profile"""
-        tools = self.db.get_tools_by_profile(profile_id)
-        return len(tools) if tools else 0
+        row = self.db.execute_query(
+            'SELECT COUNT(*) FROM Tools WHERE Profile_ID = ?',
+            (profile_id,),
+            fetch_one=True
+        )
+        return row[0] if row else 0
     
     def get_profile_statistics(self, profile_id: int) -> Dict[str, Any]:
         """Gets profile statistics"""
-        tools = self.db.get_tools_by_profile(profile_id)
+        tools = self.db.get_tools_by_profile(profile_id, stream=True)
         
         stats = {
-            'total_tools': len(tools),
+            'total_tools': 0,
             'by_position': {'Bottom': 0, 'Top': 0, 'Right': 0, 'Left': 0},
             'by_type': {'Straight': 0, 'Profile': 0},
             'total_knives': 0
         }
         
         for tool in tools:
+            stats['total_tools'] += 1
             position = tool['Position'] if len(tool) > 2 else None
             tool_type = tool['Tool_Type'] if len(tool) > 3 else None
             knives = tool['Knives_Count'] if len(tool) > 6 else 0
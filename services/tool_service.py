@@ -44,46 +44,49 @@ class ToolService(Observable):
     
     def get_tools_by_profile(self, profile_id: int) -> List[Tool]:
         """Gets tools for a profile"""
-        rows = self.db.get_tools_by_profile(profile_id)
-        return [Tool.from_db_row(row) for row in rows] if rows else []
+        return Tool.from_db_rows(self.db.get_tools_by_profile(profile_id, stream=True))
     
-    def get_tool(self, tool_id: int) -> Optional[Tool]:
+    def get_tool(self, tool_id: int, with_photo: bool = True) -> Optional[Tool]:
         """Gets a tool by ID"""
-        row = self.db.get_tool(tool_id)
+        row = self.db.get_tool(tool_id, with_photo)
         if row:
             return Tool.from_db_row(row)
         return None
     
+    def get_tool_photo(self, tool_id: int) -> Optional[bytes]:
+        """Loads the set photo of a tool on demand"""
+        return self.db.get_tool_photo(tool_id)
+    
+    def is_first_tool_in_set(self, tool: Tool) -> bool:
+        """Checks whether the tool is the first (lowest ID) tool of its set"""
+        if not tool.id or not tool.code:
+            return False
+        first_id = self.db.get_first_tool_id_in_set(tool.profile_id, tool.code[:5])
+        return first_id == tool.id
+    
     def get_tool_by_template_id(self, template_id: str) -> Optional[Tool]:
         """Gets a tool by its template ID"""
         if not template_id:
             return None
-        row = self.db.execute_query(
-            'SELECT * FROM Tools WHERE Template_ID = ?',
-            (template_id,),
-            fetch_one=True
-        )
+        row = self.db.get_tool_by_template_id(template_id)
         return Tool.from_db_row(row) if row else None
     
-    def get_tool_by_code(self, tool_code: str) -> Optional[Tool]:
+    def get_tool_by_code(self, tool_code: str, with_photo: bool = True) -> Optional[Tool]:
         """Gets a tool by its code"""
-        row = self.db.execute_query(
-            'SELECT * FROM Tools WHERE Auto_Generated_Code = ?',
-            (tool_code,),
-            fetch_one=True
-        )
+        row = self.db.get_tool_by_code(tool_code, with_photo)
         if row:
             return Tool.from_db_row(row)
         return None
     
     def is_tool_assigned(self, tool_id: int) -> bool:
         """Checks if a tool is assigned"""
+        # EXISTS останавливается на первой записи индекса idx_assignments_tool
         result = self.db.execute_query(
-            'SELECT COUNT(*) as count FROM Tool_Assignments WHERE Tool_ID = ?',
+            'SELECT EXISTS(SELECT 1 FROM Tool_Assignments WHERE Tool_ID = ?)',
             (tool_id,),
             fetch_one=True
         )
-        return result and result['count'] > 0
+        return bool(result and result[0])
     
     def get_available_tools_for_position(self, profile_id: int, 
                                        position: str) -> List[Tool]:
@@ -98,15 +101,15 @@ class ToolService(Observable):
         
         for head_num, data in assignments_dict.items():
             assignments[head_num] = ToolAssignment(
-                id=data['ID'],
-                profile_id=data['Profile_ID'],
-                tool_id=data['Tool_ID'],
-                head_number=data['Head_Number'],
-                rpm=data['RPM'],
-                pass_depth=data['Pass_Depth'],
-                work_material=data.get('Work_Material', ''),
-                remarks=data.get('Remarks', ''),
-                tool_code=data.get('Tool_Code', '')
+                id=data.ID,
+                profile_id=data.Profile_ID,
+                tool_id=data.Tool_ID,
+                head_number=data.Head_Number,
+                rpm=data.RPM,
+                pass_depth=data.Pass_Depth,
+                work_material=data.Work_Material,
+                remarks=data.Remarks,
+                tool_code=data.Tool_Code
             )
     
         return assignments
@@ -142,12 +145,12 @@ class ToolService(Observable):
             )
             
             # Check code uniqueness
-            existing_tool = self.get_tool_by_code(tool.code)
+            existing_tool = self.get_tool_by_code(tool.code, with_photo=False)
             if existing_tool:
                 raise ValueError(f"Tool with code {tool.code} already exist.")
             
             # Save to database
-            tool_id = self.db.add_tool(tool.to_dict())
+            tool_id = self.db.add_tool(tool.to_row())
             
             # Notify observers
             self.notify_observers('tool_created', tool_id, tool.code)
@@ -160,7 +163,7 @@ class ToolService(Observable):
         except Exception as e:
             logger.error(f"Error creating tool: {e}")
             raise ValueError("An error occurred while creating the tool. Please check the input data and try again.")
-    
+
     def update_tool(self, tool_id: int, tool: Tool) -> bool:
         """Updates a tool"""
         # ПРОВЕРКА ДОСТУПА (НОВОЕ)
@@ -168,7 +171,7 @@ class ToolService(Observable):
         
         try:
             # If key parameters changed, generate a new code
-            original = self.get_tool(tool_id)
+            original = self.get_tool(tool_id, with_photo=False)
             if original:
                 code_changed = (
                     original.profile_id != tool.profile_id or
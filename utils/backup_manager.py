@@ -12,12 +12,25 @@ import zipfile
 
 logger = logging.getLogger(__name__)
 
+
+def _backup_type(name):
+    """Тип бэкапа по имени файла: auto, scheduled или manual"""
+    if "auto" in name:
+        return "auto"
+    if "scheduled" in name:
+        return "scheduled"
+    return "manual"
+
 class BackupManager:
     """Управление резервными копиями базы данных"""
     
-    def __init__(self, db_path, backup_dir=None):
+    def __init__(self, db_path, backup_dir=None, before_restore=None):
         self.db_path = Path(db_path)
+        # Вызывается перед заменой файла базы (например, чтобы закрыть соединения)
+        self.before_restore = before_restore
         self.backup_dir = Path(backup_dir) if backup_dir else self.db_path.parent / "backups"
+        # (ключ состояния папки, список бэкапов) - см. list_backups()
+        self._backups_cache = None
         
         # Создаем директорию для бэкапов если её нет
         self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -45,7 +58,7 @@ class BackupManager:
             zip_path = self.backup_dir / f"{backup_name}.zip"
             
             # Создаем копию базы данных
-            shutil.copy2(self.db_path, backup_path)
+            self._copy_database(self.db_path, backup_path)
             
             # Создаем ZIP архив с базой
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
@@ -61,6 +74,7 @@ class BackupManager:
             
             # Очищаем старые бэкапы если превышен лимит
             self._cleanup_old_backups(max_backups)
+            self._backups_cache = None
             
             return {
                 'path': str(zip_path),
@@ -75,6 +89,16 @@ class BackupManager:
             logger.error(f"Error creating backup: {e}")
             return None
     
+    def _copy_database(self, source_path, target_path):
+        """Копирует базу через backup API SQLite (учитывает данные из файла -wal)"""
+        src = sqlite3.connect(str(source_path))
+        dst = sqlite3.connect(str(target_path))
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    
     def _get_backup_info(self, backup_path):
         """Получает информацию о бэкапе"""
         try:
@@ -120,25 +144,55 @@ class BackupManager:
         except Exception as e:
             logger.error(f"Error cleaning up old backups: {e}")
     
+    def _backup_dir_key(self):
+        """Ключ состояния папки бэкапов: меняется при создании/удалении файлов"""
+        st = os.stat(self.backup_dir)
+        return (st.st_mtime_ns, st.st_size)
+    
     def list_backups(self):
-        """Возвращает список всех доступных бэкапов"""
+        """Возвращает список всех доступных бэкапов
+        
+        Результат кэшируется до изменения папки бэкапов: повторный вызов
+        (например, из get_backup_stats) не открывает каждый архив заново.
+        """
+        try:
+            key = self._backup_dir_key()
+        except OSError:
+            key = None
+        cache = self._backups_cache
+        if key is not None and cache is not None and cache[0] == key:
+            return list(cache[1])
+        
         backups = []
         
         try:
-            for backup_file in self.backup_dir.glob("weinig_backup_*.zip"):
-                stat = backup_file.stat()
-                backup_info = self._get_backup_info(backup_file)
-                
+            # Один проход scandir и один stat на файл; архивы не открываются -
+            # размер берется из того же stat
+            with os.scandir(self.backup_dir) as it:
+                entries = [
+                    (entry, entry.stat()) for entry in it
+                    if entry.name.startswith("weinig_backup_")
+                    and entry.name.endswith(".zip") and entry.is_file()
+                ]
+            
+            # Сортируем по дате создания (новые первыми)
+            entries.sort(key=lambda item: item[1].st_mtime, reverse=True)
+            
+            for entry, stat in entries:
+                created = datetime.fromtimestamp(stat.st_mtime)
                 backups.append({
-                    'name': backup_file.name,
-                    'path': str(backup_file),
-                    'size_mb': backup_info['size_mb'],
-                    'created': datetime.fromtimestamp(stat.st_mtime),
+                    'name': entry.name,
+                    'path': entry.path,
+                    'size_mb': stat.st_size / (1024 * 1024),
+                    'created': created,
+                    'created_display': created.strftime("%Y-%m-%d %H:%M"),
+                    'type': _backup_type(entry.name),
                     'modified': datetime.fromtimestamp(stat.st_ctime)
                 })
             
-            # Сортируем по дате создания (новые первыми)
-            backups.sort(key=lambda x: x['created'], reverse=True)
+            if key is not None:
+                self._backups_cache = (key, backups)
+                backups = list(backups)
             
         except Exception as e:
             logger.error(f"Error listing backups: {e}")
@@ -160,10 +214,13 @@ class BackupManager:
                 logger.error(f"Backup file not found: {backup_name}")
                 return False
             
+            if self.before_restore:
+                self.before_restore()
+            
             # Создаем резервную копию текущей базы перед восстановлением
             if self.db_path.exists():
                 temp_backup = self.db_path.parent / f"temp_pre_restore_{datetime.now().strftime('%H%M%S')}.db"
-                shutil.copy2(self.db_path, temp_backup)
+                self._copy_database(self.db_path, temp_backup)
                 logger.info(f"Created temporary backup before restore: {temp_backup.name}")
             
             # Восстанавливаем из архива
@@ -182,6 +239,16 @@ class BackupManager:
                 extracted_path = self.backup_dir / db_files[0]
                 shutil.move(extracted_path, target_path)
             
+            # Старые файлы WAL относятся к прежней базе и не должны применяться к восстановленной
+            for suffix in ('-wal', '-shm'):
+                sidecar = Path(f"{target_path}{suffix}")
+                if sidecar.exists():
+                    try:
+                        sidecar.unlink()
+                    except OSError as e:
+                        logger.warning(f"Could not remove {sidecar.name}: {e}")
+            
+            self._backups_cache = None
             logger.info(f"Database restored from backup: {backup_name}")
             return True
             